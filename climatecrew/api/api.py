@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 import requests
 import os
 from datetime import datetime, timedelta
@@ -8,6 +8,15 @@ from flask_cors import CORS
 import json
 import groq  # You'll need to install this: pip install groq
 import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# maintenance.py lives with the app, one directory up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from maintenance import DatabaseMaintenance
+from summary_cache import SummaryCache
+from news_cache import NewsCache
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +35,53 @@ openai.api_key = OPENAI_API_KEY
 # Configure Groq client
 groq_client = groq.Client(api_key=GROQ_API_KEY)
 
+# Articles are summarized in parallel, but never more than this many LLM
+# calls at once so a page does not trip the providers' rate limits
+SUMMARY_WORKERS = 5
+# Per-call timeout for one summary request, in seconds
+SUMMARY_TIMEOUT = 10
+# The whole page gives up on slow summaries after this and shows the excerpt
+SUMMARY_DEADLINE = 20
+# Articles packed into one Groq request. Fewer requests stay under the rate
+# limit, more requests in parallel get the first summaries out sooner.
+SUMMARY_BATCH_SIZE = 4
+
+summary_executor = ThreadPoolExecutor(
+    max_workers=SUMMARY_WORKERS, thread_name_prefix="summarize")
+
+# Use specific climate-related keywords for better filtering
+CLIMATE_KEYWORDS = "climate change OR global warming OR climate crisis OR carbon emissions OR climate action OR sustainability OR pollution OR environment OR biodiversity OR floods OR drought OR heatwave OR deforestation OR renewable energy OR climate policy OR climate adaptation OR climate mitigation OR forest fires OR climate change India OR pollution Delhi OR Ganga cleaning"
+
+NEWS_API_TIMEOUT = 10
+
+# NewsAPI keeps returning the same articles, so summaries outlive requests
+summary_cache = SummaryCache(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "summary_cache.db"))
+
+DB_PATH = "../user_auth.db"  # Adjust path as needed
+
+# Requests only read the database, so "idle" means no request lately
+last_request_at = time.monotonic()
+
+
+@app.before_request
+def note_request():
+    global last_request_at
+    last_request_at = time.monotonic()
+    # Started from the first request rather than at import or in __main__:
+    # that covers app.run, the debug reloader (whose watcher parent never
+    # serves) and WSGI servers alike, once per serving process
+    maintenance.start()
+
+
+def api_is_idle(seconds):
+    return time.monotonic() - last_request_at >= seconds
+
+
+# This process cannot see the app's writes, so never run the unbudgeted
+# one-time VACUUM from here; maintenance.py and delete_rows.py do that
+maintenance = DatabaseMaintenance(DB_PATH, is_idle=api_is_idle, allow_vacuum=False)
+
 
 @app.route('/api/generate-task', methods=['GET'])
 def generate_task():
@@ -37,8 +93,7 @@ def generate_task():
             return jsonify({"error": "Missing user_id parameter"}), 400
 
         # Connect to the database to get user profile data
-        db_path = "../user_auth.db"  # Adjust path as needed
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
 
         # Get user profile information
@@ -127,54 +182,275 @@ def get_climate_news():
         page_size = request.args.get('pageSize', default=10, type=int)
         page = request.args.get('page', default=1, type=int)
 
-        # Use specific climate-related keywords for better filtering
-        climate_keywords = "climate change OR global warming OR climate crisis OR carbon emissions OR climate action OR sustainability OR pollution OR environment OR biodiversity OR floods OR drought OR heatwave OR deforestation OR renewable energy OR climate policy OR climate adaptation OR climate mitigation OR forest fires OR climate change India OR pollution Delhi OR Ganga cleaning"
-
-        # News API request
-        url = f"https://newsapi.org/v2/everything"
-        params = {
-            'q': climate_keywords,
-            'language': 'en',
-            'sortBy': 'relevancy',
-            'pageSize': page_size,
-            'page': page,
-            'apiKey': NEWS_API_KEY
-        }
+        # Served from the cache; a stale page comes back at once and is
+        # refreshed in the background
+        news_data = news_cache.get((CLIMATE_KEYWORDS, page, page_size))
 
-        response = requests.get(url, params=params)
-        news_data = response.json()
+        articles = extract_articles(news_data)
 
-        if response.status_code != 200:
-            return jsonify({"error": f"News API error: {news_data.get('message')}"})
+        # Summarize using Groq, all articles at once
+        summaries = summarize_articles(
+            [(url, title, content) for url, title, _, content in articles])
 
-        articles = news_data.get('articles', [])
-        climate_articles = []
+        climate_articles = [{
+            "title": title,
+            "image": image_url,
+            "summary": summary
+        } for (_, title, image_url, _), summary in zip(articles, summaries)]
 
-        for article in articles:
-            title = article.get('title')
-            image_url = article.get('urlToImage')
-            content = article.get('content') or article.get('description')
+        return jsonify({
+            "status": "success",
+            "count": len(climate_articles),
+            "articles": climate_articles
+        })
 
-            if not (title and content):
-                continue
+    except Exception as e:
+        return jsonify({"error": str(e)})
 
-            # Summarize using Groq
-            summary = summarize_with_groq(title, content)
 
-            climate_articles.append({
+def fetch_news(key):
+    """Fetch one page of articles from News API; raises on an error reply"""
+    query, page, page_size = key
+    response = requests.get("https://newsapi.org/v2/everything", params={
+        'q': query,
+        'language': 'en',
+        'sortBy': 'relevancy',
+        'pageSize': page_size,
+        'page': page,
+        'apiKey': NEWS_API_KEY
+    }, timeout=NEWS_API_TIMEOUT)
+    news_data = response.json()
+
+    if response.status_code != 200:
+        raise RuntimeError(f"News API error: {news_data.get('message')}")
+    return news_data
+
+
+# Pages keyed by (query, page, pageSize): fresh for 10 minutes, then served
+# stale for up to a day while a background fetch replaces them
+news_cache = NewsCache(fetch_news, fresh_for=600, stale_for=24 * 3600)
+
+
+@app.route('/api/climate-news/stream', methods=['GET'])
+def stream_climate_news():
+    """Same articles as /api/climate-news, each sent as soon as it is summarized
+
+    Emits newline-delimited JSON by default, or server-sent events with
+    ?format=sse. The first line is {"count": n}, then one
+    {"index", "title", "image", "summary"} object per article in the order
+    the summaries finish, then {"done": true}. Errors arrive as {"error"}.
+    """
+    page_size = request.args.get('pageSize', default=10, type=int)
+    page = request.args.get('page', default=1, type=int)
+    sse = request.args.get('format') == 'sse'
+
+    def encode(event):
+        line = json.dumps(event)
+        return f"data: {line}\n\n" if sse else line + "\n"
+
+    def generate():
+        try:
+            news_data = news_cache.get((CLIMATE_KEYWORDS, page, page_size))
+        except Exception as e:
+            yield encode({"error": str(e)})
+            return
+
+        articles = extract_articles(news_data)
+        yield encode({"count": len(articles)})
+        for index, summary in iter_summaries(
+                [(url, title, content) for url, title, _, content in articles]):
+            _, title, image_url, _ = articles[index]
+            yield encode({
+                "index": index,
                 "title": title,
                 "image": image_url,
                 "summary": summary
             })
+        yield encode({"done": True})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        # Keep proxies from buffering the stream into one late response
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def extract_articles(news_data):
+    """(url, title, image, content) for the News API articles worth showing"""
+    articles = []
+    for article in news_data.get('articles', []):
+        title = article.get('title')
+        content = article.get('content') or article.get('description')
+        if title and content:
+            articles.append((article.get('url'), title,
+                             article.get('urlToImage'), content))
+    return articles
+
+
+def summarize_articles(articles):
+    """Summarize (url, title, content) triples, keeping their order"""
+    summaries = [None] * len(articles)
+    for index, summary in iter_summaries(articles):
+        summaries[index] = summary
+    return summaries
+
+
+def iter_summaries(articles):
+    """Yield (index, summary) for (url, title, content) triples as each is ready
+
+    Summaries already in the cache come first. The rest are summarized in
+    batches of SUMMARY_BATCH_SIZE, concurrently, and yielded in the order
+    they finish; an article a batch reply leaves out is retried on its
+    own. Any not ready by SUMMARY_DEADLINE fall back to the truncated
+    content, so one slow call cannot hold up the whole page.
+    """
+    keys = [SummaryCache.key_for(url, title, content)
+            for url, title, content in articles]
+    cached = summary_cache.get_many(keys)
+
+    misses = [index for index, key in enumerate(keys) if key not in cached]
+    pending = {}  # future -> indices of the articles it summarizes
+    for start in range(0, len(misses), SUMMARY_BATCH_SIZE):
+        batch = misses[start:start + SUMMARY_BATCH_SIZE]
+        pending[summary_executor.submit(
+            summarize_batch, [articles[index][1:] for index in batch])] = batch
+    deadline = time.monotonic() + SUMMARY_DEADLINE
+    fresh = {}
+    try:
+        for index, key in enumerate(keys):
+            if key in cached:
+                yield index, cached[key]
+
+        while pending:
+            done, _ = wait(pending, timeout=max(deadline - time.monotonic(), 0),
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                indices = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"Summary batch failed: {e!r}")
+                    results = [None] * len(indices)
+
+                for index, summary in zip(indices, results):
+                    _, title, content = articles[index]
+                    if summary is None and len(indices) > 1:
+                        pending[summary_executor.submit(
+                            summarize_batch, [(title, content)])] = [index]
+                        continue
+                    if summary is None:
+                        summary = truncate_content(content)
+                    # Both providers failing also yields the excerpt; retry those later
+                    elif summary != truncate_content(content):
+                        fresh[keys[index]] = summary
+                    yield index, summary
+
+        for future, indices in list(pending.items()):
+            future.cancel()
+            del pending[future]
+            for index in indices:
+                _, title, content = articles[index]
+                print(f"Summary for {title!r} not ready in time")
+                yield index, truncate_content(content)
+    finally:
+        # Also runs when a streaming client disconnects part way through
+        for future in pending:
+            future.cancel()
+        summary_cache.put_many(fresh)
+        stats = summary_cache.stats()
+        print(f"Summary cache: {len(cached)}/{len(keys)} hits this request, "
+              f"{stats['hit_ratio']:.0%} overall, {stats['entries']} entries")
+
+
+def summarize_batch(articles):
+    """Summaries for (title, content) pairs, None where a batch reply had none"""
+    if len(articles) == 1:
+        return [summarize_with_groq(*articles[0])]
+    return summarize_batch_with_groq(articles)
+
+
+def truncate_content(content, length=150):
+    return (content[:length] + '...') if len(content) > length else content
+
+
+def strip_intro_phrases(summary):
+    """Remove common introductory phrases"""
+    intro_phrases = [
+        "Here is a summary of the article in 2-3 clear sentences:",
+        "Here is a summary of the article in 2-3 sentences:",
+        "Here's a summary of the article:",
+        "Here is a summary:",
+        "Summary:"
+    ]
+
+    for phrase in intro_phrases:
+        if summary.lower().startswith(phrase.lower()):
+            summary = summary[len(phrase):].strip()
+
+    return summary
+
+
+def summarize_batch_with_groq(articles):
+    """Summarize several (title, content) pairs in one Groq request
+
+    The model answers in JSON with each summary tagged by article number.
+    Returns one summary per article, None for any the reply missed or
+    that could not be parsed, so callers can retry just those.
+    """
+    try:
+        numbered = "\n\n".join(
+            f"Article {number}\nTitle: {title}\n\nContent: {content}"
+            for number, (title, content) in enumerate(articles, start=1))
 
-        return jsonify({
-            "status": "success",
-            "count": len(climate_articles),
-            "articles": climate_articles
-        })
+        response = groq_client.chat.completions.create(
+            model="llama3-8b-8192",
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that summarizes climate news concisely."},
+                {"role": "user", "content": (
+                    "Summarize each of these climate news articles in 2-3 clear sentences. "
+                    "Reply with JSON only, in the form "
+                    '{"summaries": [{"index": 1, "summary": "..."}]}, '
+                    "with one entry per article numbered as below.\n\n" + numbered)}
+            ],
+            response_format={"type": "json_object"},
+            max_tokens=150 * len(articles) + 50,
+            timeout=SUMMARY_TIMEOUT
+        )
 
+        return parse_batch_summaries(
+            response.choices[0].message.content, len(articles))
     except Exception as e:
-        return jsonify({"error": str(e)})
+        print(f"Groq batch summarization error: {str(e)}")
+        return [None] * len(articles)
+
+
+def parse_batch_summaries(text, count):
+    """Map a JSON batch reply back to a list of count summaries"""
+    summaries = [None] * count
+    try:
+        data = json.loads(text)
+    except ValueError:
+        # Tolerate prose around the JSON object
+        try:
+            data = json.loads(text[text.index('{'):text.rindex('}') + 1])
+        except ValueError:
+            print("Could not parse batch summary reply")
+            return summaries
+
+    items = data.get('summaries') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return summaries
+
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        number, summary = item.get('index'), item.get('summary')
+        if (isinstance(number, int) and 1 <= number <= count
+                and isinstance(summary, str) and summary.strip()):
+            summaries[number - 1] = strip_intro_phrases(summary.strip())
+    return summaries
 
 
 def summarize_with_groq(title, content):
@@ -187,25 +463,13 @@ def summarize_with_groq(title, content):
                 {"role": "system", "content": "You are a helpful assistant that summarizes climate news concisely."},
                 {"role": "user", "content": f"Summarize this climate news article in 2-3 clear sentences:\n\n{text_to_summarize}"}
             ],
-            max_tokens=150
+            max_tokens=150,
+            timeout=SUMMARY_TIMEOUT
         )
 
         summary = response.choices[0].message.content.strip()
 
-        # Remove common introductory phrases
-        intro_phrases = [
-            "Here is a summary of the article in 2-3 clear sentences:",
-            "Here is a summary of the article in 2-3 sentences:",
-            "Here's a summary of the article:",
-            "Here is a summary:",
-            "Summary:"
-        ]
-
-        for phrase in intro_phrases:
-            if summary.lower().startswith(phrase.lower()):
-                summary = summary[len(phrase):].strip()
-
-        return summary
+        return strip_intro_phrases(summary)
     except Exception as e:
         print(f"Groq summarization error: {str(e)}")
         # Fallback to OpenAI if Groq fails
@@ -222,28 +486,16 @@ def summarize_with_openai(title, content):
                 {"role": "system", "content": "You are a helpful assistant that summarizes climate news concisely."},
                 {"role": "user", "content": f"Summarize this climate news article in 2-3 clear sentences:\n\n{text_to_summarize}"}
             ],
-            max_tokens=150
+            max_tokens=150,
+            request_timeout=SUMMARY_TIMEOUT
         )
 
         summary = response.choices[0].message.content.strip()
 
-        # Remove common introductory phrases
-        intro_phrases = [
-            "Here is a summary of the article in 2-3 clear sentences:",
-            "Here is a summary of the article in 2-3 sentences:",
-            "Here's a summary of the article:",
-            "Here is a summary:",
-            "Summary:"
-        ]
-
-        for phrase in intro_phrases:
-            if summary.lower().startswith(phrase.lower()):
-                summary = summary[len(phrase):].strip()
-
-        return summary
+        return strip_intro_phrases(summary)
     except Exception as e:
         # If all summarization fails, return truncated content
-        return (content[:150] + '...') if len(content) > 150 else content
+        return truncate_content(content)
 
 
 if __name__ == '__main__':
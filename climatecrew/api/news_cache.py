@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class NewsCache:
+    """In-memory cache of upstream responses with stale-while-revalidate
+
+    get(key) returns a cached value younger than fresh_for seconds straight
+    away. A value older than that but younger than stale_for is also
+    returned straight away, while a background refresh replaces it. Only a
+    missing or fully expired entry makes the caller wait on fetch(key).
+
+    Concurrent misses for the same key share one upstream call. A failed
+    refresh keeps the old value, so an upstream outage or rate limit is
+    invisible until stale_for runs out. Errors are never cached.
+    """
+
+    def __init__(self, fetch, fresh_for=600, stale_for=24 * 3600, max_entries=100):
+        self.fetch = fetch
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (fetched_at, value)
+        self._in_flight = {}  # key -> Future of the running fetch
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="news-refresh")
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.monotonic() - entry[0] if entry else None
+            if entry and age < self.fresh_for:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry and age < self.stale_for:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._in_flight:
+                    self._in_flight[key] = self._executor.submit(
+                        self._refresh, key)
+                return entry[1]
+
+            self.misses += 1
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if owner:
+            # This caller fetches; anyone else missing the same key waits on it
+            try:
+                future.set_result(self._refresh(key))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _refresh(self, key):
+        try:
+            value = self.fetch(key)
+            with self._lock:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+        except Exception as e:
+            print(f"News refresh failed: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+            }
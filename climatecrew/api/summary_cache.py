@@ -0,0 +1,115 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+
+class SummaryCache:
+    """Article summaries kept in a local SQLite file between requests
+
+    Entries are keyed by article URL, or by a hash of title and content for
+    articles without one. Entries older than ttl seconds are treated as
+    missing. Once the cache grows past max_entries, the least recently
+    used entries are evicted.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=5000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Flask request threads and summary workers share this connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_summaries_last_used
+            ON summaries (last_used)
+        ''')
+        self._conn.commit()
+
+    @staticmethod
+    def key_for(url, title, content):
+        """Cache key for an article: its URL, else a hash of what it says"""
+        if url:
+            return url
+        digest = hashlib.sha256(f"{title}\n{content}".encode()).hexdigest()
+        return f"sha256:{digest}"
+
+    def get_many(self, keys):
+        """Return {key: summary} for the fresh entries among keys"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        now = time.time()
+        found = {}
+        with self._lock:
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(f'''
+                    SELECT key, summary FROM summaries
+                    WHERE key IN ({placeholders}) AND created_at >= ?
+                ''', (*chunk, now - self.ttl)).fetchall())
+            if found:
+                self._conn.executemany(
+                    "UPDATE summaries SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found])
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, summaries):
+        """Store {key: summary} and evict whatever no longer fits"""
+        if not summaries:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.executemany('''
+                    INSERT OR REPLACE INTO summaries (key, summary, created_at, last_used)
+                    VALUES (?, ?, ?, ?)
+                ''', [(key, summary, now, now) for key, summary in summaries.items()])
+                self._evict(now)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Summary cache write error: {e}")
+                self._conn.rollback()
+
+    def _evict(self, now):
+        self._conn.execute(
+            "DELETE FROM summaries WHERE created_at < ?", (now - self.ttl,))
+        self._conn.execute('''
+            DELETE FROM summaries WHERE key IN (
+                SELECT key FROM summaries ORDER BY last_used DESC
+                LIMIT -1 OFFSET ?
+            )
+        ''', (self.max_entries,))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._conn.execute(
+                "SELECT COUNT(*) FROM summaries").fetchone()[0]
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
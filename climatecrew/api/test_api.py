@@ -0,0 +1,188 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+import api
+from news_cache import NewsCache
+from summary_cache import SummaryCache
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeChoice:
+    def __init__(self, content):
+        self.message = FakeMessage(content)
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.choices = [FakeChoice(content)]
+
+
+class FakeGroq:
+    """Stands in for groq_client.chat.completions
+
+    Batch requests (JSON mode) get one summary per article except the
+    titles in skip; single requests get "Summary: S-<title>". Titles in
+    delays sleep that long first.
+    """
+
+    def __init__(self, skip=(), delays=None, reply=None):
+        self.skip = set(skip)
+        self.delays = delays or {}
+        self.reply = reply
+        self.calls = []
+        self.chat = self
+        self.completions = self
+
+    def create(self, model, messages, **kwargs):
+        titles = re.findall(r"Title: (\S+)", messages[-1]["content"])
+        batch = kwargs.get("response_format") is not None
+        self.calls.append(("batch" if batch else "single", titles))
+        time.sleep(max([self.delays.get(title, 0) for title in titles] or [0]))
+
+        if self.reply is not None:
+            return FakeResponse(self.reply)
+        if batch:
+            return FakeResponse(json.dumps({"summaries": [
+                {"index": number, "summary": f"B-{title}"}
+                for number, title in enumerate(titles, start=1)
+                if title not in self.skip]}))
+        return FakeResponse(f"Summary: S-{titles[0]}")
+
+
+class TestNewsSummaries(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.saved = (api.groq_client, api.summary_cache, api.news_cache,
+                      api.SUMMARY_DEADLINE)
+        api.summary_cache = SummaryCache(os.path.join(self.tmp_dir, "cache.db"))
+        api.groq_client = self.groq = FakeGroq()
+
+    def tearDown(self):
+        api.summary_cache.close()
+        (api.groq_client, api.summary_cache, api.news_cache,
+         api.SUMMARY_DEADLINE) = self.saved
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def articles(self, *titles):
+        return [(f"https://example.com/{title}", title, f"Body of {title}")
+                for title in titles]
+
+    def test_parse_batch_summaries_maps_by_index(self):
+        reply = json.dumps({"summaries": [
+            {"index": 3, "summary": "third"},
+            {"index": 1, "summary": "Summary: first"},
+            {"index": 4, "summary": "out of range"},
+            {"index": "2", "summary": "not an int"},
+            {"index": 2, "summary": "  "},
+            "not an object",
+        ]})
+
+        self.assertEqual(api.parse_batch_summaries(reply, 3),
+                         ["first", None, "third"])
+
+    def test_parse_batch_summaries_tolerates_prose_and_bad_json(self):
+        self.assertEqual(api.parse_batch_summaries(
+            'Sure! {"summaries": [{"index": 2, "summary": "b"}]} Hope it helps',
+            2), [None, "b"])
+        self.assertEqual(api.parse_batch_summaries(
+            '[{"index": 1, "summary": "a"}]', 1), ["a"])
+        self.assertEqual(api.parse_batch_summaries("not json {", 2), [None, None])
+        self.assertEqual(api.parse_batch_summaries('{"summaries": "x"}', 1), [None])
+
+    def test_batches_and_retries_missing_articles_one_by_one(self):
+        self.groq.skip = {"c"}
+
+        summaries = api.summarize_articles(self.articles(*"abcdefg"))
+
+        self.assertEqual(summaries, ["B-a", "B-b", "S-c", "B-d", "B-e", "B-f", "B-g"])
+        batches = [titles for kind, titles in self.groq.calls if kind == "batch"]
+        self.assertEqual(sorted(batches), [list("abcd"), list("efg")])
+        self.assertIn(("single", ["c"]), self.groq.calls)
+        self.assertEqual(len(self.groq.calls), 3)
+
+    def test_unparseable_batch_falls_back_per_article(self):
+        self.groq.reply = "no json here"
+
+        summaries = api.summarize_articles(self.articles("a", "b"))
+
+        # The per-article retry gets the same useless reply, as plain text
+        self.assertEqual(summaries, ["no json here", "no json here"])
+        self.assertEqual([kind for kind, _ in self.groq.calls],
+                         ["batch", "single", "single"])
+
+    def test_cached_summaries_skip_the_llm(self):
+        api.summarize_articles(self.articles("a", "b"))
+        calls = len(self.groq.calls)
+
+        self.assertEqual(api.summarize_articles(self.articles("a", "b")),
+                         ["B-a", "B-b"])
+        self.assertEqual(len(self.groq.calls), calls)
+        self.assertEqual(api.summary_cache.stats()['hits'], 2)
+
+    def test_batches_run_concurrently_and_keep_article_order(self):
+        self.groq.delays = {"a": 0.3, "e": 0.3}
+
+        started = time.monotonic()
+        summaries = api.summarize_articles(self.articles(*"abcdefgh"))
+
+        self.assertEqual(summaries, [f"B-{title}" for title in "abcdefgh"])
+        self.assertLess(time.monotonic() - started, 0.55)
+
+    def test_slow_summaries_fall_back_to_excerpt_at_deadline(self):
+        api.SUMMARY_DEADLINE = 0.2
+        self.groq.delays = {"slow": 1.0}
+        articles = self.articles("slow")
+
+        started = time.monotonic()
+        self.assertEqual(api.summarize_articles(articles), ["Body of slow"])
+        self.assertLess(time.monotonic() - started, 0.6)
+        # Excerpts are not cached, the next request tries again
+        self.assertEqual(api.summary_cache.get_many(
+            [SummaryCache.key_for(*articles[0])]), {})
+
+    def test_stream_sends_each_article_as_it_is_ready(self):
+        api.news_cache = NewsCache(lambda key: {"articles": [
+            {"url": f"https://example.com/{title}", "title": title,
+             "urlToImage": None, "content": f"Body of {title}"}
+            for title in ("slow", "fast")] + [{"title": "no content"}]})
+        self.groq.delays = {"slow": 0.2}
+        api.summary_cache.put_many({"https://example.com/slow": "cached slow"})
+        client = api.app.test_client()
+
+        response = client.get('/api/climate-news/stream')
+        events = [json.loads(line) for line in response.data.decode().splitlines()]
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(events[0], {"count": 2})
+        self.assertEqual(events[-1], {"done": True})
+        self.assertEqual([(event["index"], event["summary"]) for event in events[1:-1]],
+                         [(0, "cached slow"), (1, "S-fast")])
+
+        response = client.get('/api/climate-news/stream?format=sse')
+        chunks = response.data.decode().split("\n\n")
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertEqual(chunks[0], 'data: {"count": 2}')
+
+    def test_stream_reports_upstream_errors_in_band(self):
+        def fail(key):
+            raise RuntimeError("News API error: rate limited")
+        api.news_cache = NewsCache(fail)
+
+        response = api.app.test_client().get('/api/climate-news/stream')
+
+        self.assertEqual(json.loads(response.data),
+                         {"error": "News API error: rate limited"})
+
+
+if __name__ == '__main__':
+    unittest.main()
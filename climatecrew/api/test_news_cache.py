@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+from news_cache import NewsCache
+
+
+class TestNewsCache(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+
+        def fetch(key):
+            self.calls.append(key)
+            self.release.wait()
+            if self.fail:
+                raise RuntimeError("News API error: rate limited")
+            return {"page": key, "version": len(self.calls)}
+
+        self.cache = NewsCache(fetch, fresh_for=60, stale_for=3600)
+
+    def age_entries(self, seconds):
+        for key, (fetched_at, value) in list(self.cache._entries.items()):
+            self.cache._entries[key] = (fetched_at - seconds, value)
+
+    def wait_for_refresh(self, key):
+        future = self.cache._in_flight.get(key)
+        if future is not None:
+            future.exception()
+
+    def test_fresh_entries_do_not_refetch(self):
+        self.assertEqual(self.cache.get(1)["version"], 1)
+        self.assertEqual(self.cache.get(1)["version"], 1)
+        self.assertEqual(self.calls, [1])
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_stale_entry_is_served_while_refreshing(self):
+        self.cache.get(1)
+        self.age_entries(120)
+        self.release.clear()
+
+        # Upstream is hanging, the stale page still comes back at once
+        self.assertEqual(self.cache.get(1)["version"], 1)
+        self.release.set()
+        self.wait_for_refresh(1)
+        self.assertEqual(self.cache.get(1)["version"], 2)
+
+    def test_failed_refresh_keeps_stale_value(self):
+        self.cache.get(1)
+        self.age_entries(120)
+        self.fail = True
+        self.assertEqual(self.cache.get(1)["version"], 1)
+        self.wait_for_refresh(1)
+        self.assertEqual(self.cache.get(1)["version"], 1)
+
+        self.age_entries(7200)
+        with self.assertRaises(RuntimeError):
+            self.cache.get(1)
+
+    def test_concurrent_misses_share_one_fetch(self):
+        self.release.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get(1)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, [1])
+        self.assertEqual(len(results), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from summary_cache import SummaryCache
+
+
+class TestSummaryCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = SummaryCache(os.path.join(self.tmp_dir, "cache.db"),
+                                  max_entries=3)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_hits_and_misses_are_counted(self):
+        key = SummaryCache.key_for("https://example.com/a", "Title", "Body")
+        self.cache.put_many({key: "Short summary"})
+
+        found = self.cache.get_many([key, "https://example.com/missing"])
+
+        self.assertEqual(found, {key: "Short summary"})
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_articles_without_url_are_keyed_by_content(self):
+        first = SummaryCache.key_for(None, "Floods", "River levels rose")
+        self.assertEqual(first, SummaryCache.key_for("", "Floods", "River levels rose"))
+        self.assertNotEqual(first, SummaryCache.key_for(None, "Floods", "Levels fell"))
+
+    def test_expired_and_least_recently_used_entries_go(self):
+        for key in ("a", "b", "c"):
+            self.cache.put_many({key: key.upper()})
+            time.sleep(0.01)
+        self.cache.get_many(["a"])  # "b" is now the least recently used
+        self.cache.put_many({"d": "D"})
+        self.assertEqual(set(self.cache.get_many(["a", "b", "c", "d"])),
+                         {"a", "c", "d"})
+
+        self.cache.ttl = 0
+        time.sleep(0.01)
+        self.assertEqual(self.cache.get_many(["a", "c", "d"]), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
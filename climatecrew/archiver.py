@@ -0,0 +1,175 @@
+"""Move old submissions out of the hot database into per-period archives
+
+Archives are ordinary SQLite files, archive/submissions_<period>.db next to
+the main database, holding a user_submissions table with the same columns.
+DatabaseHelper ATTACHes them on demand when a feed is paged past the rows
+still in the hot table, so archived posts stay readable.
+
+Usage:
+    python archiver.py --max-age-days 365 --period year
+"""
+import os
+import re
+import sqlite3
+from datetime import date, timedelta
+
+ARCHIVE_COLUMNS = ("id, user_id, task_text, image, latitude, longitude, "
+                   "location_text, description, submission_date, upvotes, image_hash")
+
+# Archive period -> length of the submission_date prefix that names it
+PERIODS = {"year": 4, "month": 7}
+
+
+def archive_path(archive_dir, period):
+    return os.path.join(archive_dir, f"submissions_{period}.db")
+
+
+def list_archives(archive_dir):
+    """(period, path) of every archive file, newest period first"""
+    if not os.path.isdir(archive_dir):
+        return []
+    archives = []
+    for name in os.listdir(archive_dir):
+        match = re.fullmatch(r"submissions_([0-9-]+)\.db", name)
+        if match:
+            archives.append((match.group(1), os.path.join(archive_dir, name)))
+    return sorted(archives, reverse=True)
+
+
+def create_archive_schema(conn, alias):
+    """Create the archive table and its feed indexes in an attached database"""
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {alias}.user_submissions (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            task_text TEXT NOT NULL,
+            image BLOB,
+            latitude REAL,
+            longitude REAL,
+            location_text TEXT,
+            description TEXT,
+            submission_date TEXT,
+            upvotes INTEGER DEFAULT 0,
+            image_hash TEXT
+        )
+    ''')
+    # Same keyset orders as the hot table, so archive pages are index seeks
+    conn.execute(f'''
+        CREATE INDEX IF NOT EXISTS {alias}.idx_archive_feed
+        ON user_submissions (submission_date DESC, id DESC)
+    ''')
+    conn.execute(f'''
+        CREATE INDEX IF NOT EXISTS {alias}.idx_archive_user_feed
+        ON user_submissions (user_id, submission_date DESC, id DESC)
+    ''')
+
+
+class SubmissionArchiver:
+    """Moves submissions older than max_age_days into archive files
+
+    Each period (a year or a month of submission_date) goes to its own file.
+    Rows are first copied and committed into the archive, then deleted from
+    the hot table only if they are present in the archive. A crash in
+    between leaves duplicates, which readers ignore and the next run
+    cleans up; it never loses a row.
+    """
+
+    def __init__(self, db_helper, max_age_days=365, period="year"):
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+        self.db_helper = db_helper
+        self.max_age_days = max_age_days
+        self.period = period
+
+    def archive(self, today=None):
+        """Archive everything older than the cutoff; returns {period: rows moved}"""
+        cutoff = ((today or date.today())
+                  - timedelta(days=self.max_age_days)).isoformat()
+        prefix = PERIODS[self.period]
+        moved = {}
+
+        # Archived rows are read-only: settle pending upvotes and move any
+        # inline image BLOBs to the media store before the rows leave
+        self.db_helper.upvotes.flush()
+        self.db_helper.migrate_image_blobs()
+        os.makedirs(self.db_helper.archive_dir, exist_ok=True)
+
+        # ATTACH cannot run inside a transaction, so this does not go through
+        # the writer thread. BEGIN IMMEDIATE still queues it behind the
+        # writer's batches.
+        conn = sqlite3.connect(self.db_helper.db_path, timeout=30.0,
+                               isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout = 30000")
+            periods = [row[0] for row in conn.execute(f'''
+                SELECT DISTINCT substr(submission_date, 1, {prefix})
+                FROM user_submissions
+                WHERE submission_date < ?
+            ''', (cutoff,))]
+
+            for period in periods:
+                if not period or not re.fullmatch(r"[0-9-]+", period):
+                    print(f"Skipping submissions with unexpected date prefix {period!r}")
+                    continue
+                moved[period] = self._archive_period(conn, period, prefix, cutoff)
+                print(f"Archived {moved[period]} submissions from {period}")
+        finally:
+            conn.close()
+
+        return moved
+
+    def _archive_period(self, conn, period, prefix, cutoff):
+        condition = f"submission_date < ? AND substr(submission_date, 1, {prefix}) = ?"
+        conn.execute("ATTACH DATABASE ? AS archive",
+                     (archive_path(self.db_helper.archive_dir, period),))
+        try:
+            create_archive_schema(conn, "archive")
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(f'''
+                    INSERT OR REPLACE INTO archive.user_submissions ({ARCHIVE_COLUMNS})
+                    SELECT {ARCHIVE_COLUMNS} FROM main.user_submissions
+                    WHERE {condition}
+                ''', (cutoff, period))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            # The delete triggers drop the rows from the search and map indexes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = conn.execute(f'''
+                    DELETE FROM main.user_submissions
+                    WHERE {condition}
+                      AND id IN (SELECT id FROM archive.user_submissions)
+                ''', (cutoff, period)).rowcount
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return deleted
+        finally:
+            conn.execute("DETACH DATABASE archive")
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_helper import DatabaseHelper
+
+    parser = argparse.ArgumentParser(
+        description="Move old submissions into per-period archive databases")
+    parser.add_argument("--db", default="user_auth.db")
+    parser.add_argument("--max-age-days", type=int, default=365,
+                        help="archive submissions older than this (default: 365)")
+    parser.add_argument("--period", choices=sorted(PERIODS), default="year",
+                        help="one archive file per year or per month")
+    args = parser.parse_args()
+
+    db = DatabaseHelper(args.db)
+    try:
+        moved = SubmissionArchiver(db, args.max_age_days, args.period).archive()
+        print(f"Archived {sum(moved.values())} submissions into {len(moved)} archives")
+    finally:
+        db.close()
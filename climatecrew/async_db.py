@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncDatabaseHelper:
+    """Runs DatabaseHelper methods on worker threads off the Kivy main thread
+
+    Every DatabaseHelper method is available here with the same arguments,
+    plus optional callback and on_error keywords. Calls return a Future right
+    away; callback(result) or on_error(exception) is then run on the main
+    thread through Clock.schedule_once, so it can touch widgets safely.
+
+    schedule replaces Clock.schedule_once; it is called with a function
+    taking the frame delta, like Kivy does. Tests pass their own.
+    """
+
+    def __init__(self, db_helper, max_workers=2, schedule=None):
+        self.db_helper = db_helper
+        if schedule is None:
+            # Imported here so the helper can be used without a Kivy window
+            from kivy.clock import Clock
+            schedule = Clock.schedule_once
+        self.schedule = schedule
+        # Each worker thread gets its own connection from the ConnectionManager
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="db-worker")
+
+    def __getattr__(self, name):
+        method = getattr(self.db_helper, name)
+        if not callable(method):
+            return method
+
+        def call(*args, callback=None, on_error=None, **kwargs):
+            return self.submit(method, *args, callback=callback,
+                               on_error=on_error, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def submit(self, fn, *args, callback=None, on_error=None, **kwargs):
+        """Run any callable on the worker pool with the same callback handling"""
+        future = self.executor.submit(fn, *args, **kwargs)
+        if callback or on_error:
+            future.add_done_callback(
+                lambda done: self._deliver(done, callback, on_error))
+        return future
+
+    def _deliver(self, future, callback, on_error):
+        """Hand the outcome of a finished future to the main thread"""
+        error = future.exception()
+        if error is not None:
+            print(f"Background database call failed: {error}")
+            if on_error:
+                self.schedule(lambda dt: on_error(error))
+            return
+
+        if callback:
+            result = future.result()
+            self.schedule(lambda dt: callback(result))
+
+    def shutdown(self, wait=True):
+        """Finish queued calls and stop the worker threads"""
+        self.executor.shutdown(wait=wait)
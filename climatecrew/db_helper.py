@@ -1,131 +1,287 @@
 import sqlite3
 import os
-import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from media_store import MediaStore
+from upvote_buffer import UpvoteBuffer
+from migrations import apply_migrations
+from db_writer import DatabaseWriter
+from archiver import list_archives
+import password_hashing
+
+
+class ConnectionManager:
+    """Hands out one sqlite3 connection per thread for the same database file"""
+
+    def __init__(self, db_path, timeout=30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _open(self):
+        # Connections never cross threads, but close_all() runs from the
+        # main thread on shutdown, so the same-thread check is disabled
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        # Only takes effect on a new database; maintenance.py converts
+        # existing ones so deleted rows can be given back to the OS
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # WAL lets readers on other threads run while one thread writes
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def get(self):
+        """Return the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.cursor = conn.cursor()
+        return conn
+
+    def cursor(self):
+        """Return the calling thread's shared cursor"""
+        self.get()
+        return self._local.cursor
+
+    def reset(self):
+        """Close and reopen the calling thread's connection only"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            try:
+                conn.close()
+            except Exception:
+                pass  # Ignore errors when closing already closed connection
+            self._local.conn = None
+            self._local.cursor = None
+        return self.get()
+
+    def close_all(self):
+        """Close every connection handed out so far (used on shutdown)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+
+class ProfileCache:
+    """LRU cache of get_user_profile results, bounded by total bytes"""
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # user_id -> (profile, size)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _sizeof(profile):
+        # Profile images dominate, so count str/bytes payloads plus a bit of overhead
+        return 100 + sum(len(value) for value in profile
+                         if isinstance(value, (str, bytes)))
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user_id, profile):
+        size = self._sizeof(profile)
+        with self._lock:
+            self._remove(user_id)
+            if size > self.max_bytes:
+                return  # Never worth evicting everything for one entry
+            self._entries[user_id] = (profile, size)
+            self._size += size
+            # Drop least recently used profiles until we fit again
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._remove(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, user_id):
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# Archives attached at once per connection; SQLite's default limit is 10
+MAX_ATTACHED_ARCHIVES = 8
 
 
 class DatabaseHelper:
     def __init__(self, db_name="user_auth.db"):
         # Get the app directory for database storage
         self.db_path = db_name
-        self.conn = None
-        self.cursor = None
+        self.connections = ConnectionManager(self.db_path)
+        # All writes go through one thread and are committed in groups
+        self.writer = DatabaseWriter(self.connections)
+        # Images live next to the database as content-addressed files
+        self.media = MediaStore(os.path.join(
+            os.path.dirname(os.path.abspath(self.db_path)), "media"))
+        # Old submissions moved out by archiver.py, read when paging past them
+        self.archive_dir = os.path.join(
+            os.path.dirname(os.path.abspath(self.db_path)), "archive")
+        # path -> (mtime, newest submission_date) of each archive file
+        self._archive_bounds = {}
+        # Upvotes are coalesced in memory and flushed in batches
+        self.upvotes = UpvoteBuffer(self)
+        # Feed cards and the map ask for the same authors over and over
+        self.profile_cache = ProfileCache()
+        # PBKDF2 cost for new and upgraded password hashes
+        self.password_iterations = password_hashing.DEFAULT_ITERATIONS
         self.connect()
         self.create_tables()
         # self.reset_user_points()  # Only run this once to fix existing data
 
+    @property
+    def conn(self):
+        """Connection owned by the calling thread"""
+        return self.connections.get()
+
+    @property
+    def cursor(self):
+        """Cursor owned by the calling thread"""
+        return self.connections.cursor()
+
     def connect(self):
-        """Connect to database"""
+        """(Re)connect the calling thread without touching other threads"""
         try:
-            # Close any existing connection first
-            if self.conn:
-                try:
-                    self.conn.close()
-                except:
-                    pass  # Ignore errors when closing already closed connection
-
-            # Create new connection
-            self.conn = sqlite3.connect(self.db_path)
-            self.cursor = self.conn.cursor()
+            conn = self.connections.reset()
             print("Database connected successfully")
-            return self.conn
+            return conn
         except Exception as e:
             print(f"Database connection error: {e}")
-            self.conn = None
-            self.cursor = None
             return None
 
     def close(self):
-        if self.conn:
-            self.conn.close()
+        # Write out buffered upvotes and queued writes before the
+        # connections go away
+        self.upvotes.close()
+        self.writer.close()
+        self.connections.close_all()
+
+    def is_idle(self, seconds=30):
+        """True if nothing was written for `seconds` and no upvotes are pending"""
+        return (not self.upvotes.has_pending()
+                and time.monotonic() - self.writer.last_activity >= seconds)
+
+    def write(self, op, *args, **kwargs):
+        """Queue op(cursor, *args, **kwargs) on the writer thread
+
+        Returns a Future that resolves once the write is committed. The
+        public methods below wait on it, so they keep returning plain values.
+        """
+        return self.writer.submit(op, *args, **kwargs)
 
     def create_tables(self):
-        # Create users table (if not already created)
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                email TEXT UNIQUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Create user_profiles table linked to users table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_profiles (
-                user_id INTEGER PRIMARY KEY,
-                full_name TEXT,
-                username TEXT,
-                email TEXT,
-                contact TEXT,
-                city TEXT,
-                country TEXT,
-                occupation TEXT,
-                profile_image BLOB,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS task_management (
-                user_id INTEGER PRIMARY KEY,
-                current_task TEXT,
-                points INTEGER DEFAULT 0,
-                num_tasks_completed INTEGER DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            );
-        ''')
-
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_submissions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                task_text TEXT NOT NULL,
-                image BLOB,
-                latitude REAL,
-                longitude REAL,
-                location_text TEXT,
-                description TEXT,
-                submission_date TEXT,
-                upvotes INTEGER DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            );
-        ''')
-
-        self.conn.commit()
+        """Bring the schema up to date by applying any pending migrations"""
+        apply_migrations(self.conn)
 
     def hash_password(self, password):
-        # Simple password hashing using SHA-256
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Salted PBKDF2 hash; slow on purpose, so call it off the UI thread"""
+        return password_hashing.hash_password(password, self.password_iterations)
 
     def register_user(self, username, password, email):
+        """Create a user; returns the new user id, or False if taken"""
         try:
             print(username)
             password_hash = self.hash_password(password)
-            self.cursor.execute(
-                "INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)",
-                (username, password_hash, email)
-            )
-            self.conn.commit()
-            return True
+
+            def insert_user(cursor):
+                cursor.execute(
+                    "INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)",
+                    (username, password_hash, email)
+                )
+                return cursor.lastrowid
+
+            return self.write(insert_user).result()
         except sqlite3.IntegrityError:
             # Username or email already exists
             return False
 
     def authenticate_user(self, username, password):
-        password_hash = self.hash_password(password)
+        """Check credentials; returns (id, username, email) or None
+
+        Hashes that are legacy SHA-256 or below the current cost are
+        replaced with a fresh one while the plain password is at hand.
+        """
         try:
             self.cursor.execute(
-                "SELECT id, username, email FROM users WHERE username = ? AND password_hash = ?",
-                (username, password_hash)
+                "SELECT id, username, email, password_hash FROM users WHERE username = ?",
+                (username,)
             )
-            return self.cursor.fetchone()  # Returns (id, username, email) or None if not found
+            user = self.cursor.fetchone()
+
+            if user is None:
+                # Spend the same time as a real check so response times do
+                # not reveal which usernames exist
+                self.hash_password(password)
+                return None
+
+            user_id, username, email, stored_hash = user
+            if not password_hashing.verify_password(password, stored_hash):
+                return None
+
+            if password_hashing.needs_rehash(stored_hash, self.password_iterations):
+                self.write(lambda cursor, new_hash: cursor.execute(
+                    "UPDATE users SET password_hash = ? WHERE id = ?",
+                    (new_hash, user_id)), self.hash_password(password)).result()
+                print(f"Upgraded password hash for user {user_id}")
+
+            return user_id, username, email
         except Exception as e:
             print(f"Authentication error: {e}")
             return None
 
     def get_user_profile(self, user_id):
-        """Get user profile data"""
+        """Get user profile data, served from the profile cache when possible"""
+        profile = self.profile_cache.get(user_id)
+        if profile is not None:
+            return profile
+
         try:
             # Check if connection is closed and reconnect if needed
             if self.conn is None or not hasattr(self.conn, 'cursor'):
@@ -137,12 +293,20 @@ class DatabaseHelper:
 
             # First try to get from user_profiles
             cursor.execute('''
-                SELECT user_id, full_name, username, email, contact, city, country, occupation, profile_image 
+                SELECT user_id, full_name, username, email, contact, city, country, occupation,
+                       profile_image, profile_image_hash
                 FROM user_profiles WHERE user_id = ?
             ''', (user_id,))
 
             profile = cursor.fetchone()
 
+            if profile:
+                # Resolve the stored digest back to the image bytes
+                image_hash = profile[9] or self._migrate_profile_image(
+                    user_id, profile[8])
+                profile = profile[:8] + (self.media.read(image_hash)
+                                         if image_hash else None,)
+
             if not profile:
                 # Profile doesn't exist, get basic info from users table
                 cursor.execute(
@@ -152,15 +316,17 @@ class DatabaseHelper:
                 if basic_info:
                     # Create empty profile with basic info
                     user_id, _, username, email = basic_info
-                    cursor.execute('''
-                        INSERT INTO user_profiles (user_id, full_name, username, email)
+                    self.write(lambda cursor: cursor.execute('''
+                        INSERT OR IGNORE INTO user_profiles (user_id, full_name, username, email)
                         VALUES (?, ?, ?, ?)
-                    ''', (user_id, "", username, email))
-                    self.conn.commit()
+                    ''', (user_id, "", username, email))).result()
                     # Return the new profile
                     profile = (user_id, "", username,
                                email, "", "", "", "", None)
 
+            if profile:
+                self.profile_cache.put(user_id, profile)
+
             # Don't close cursor or connection
             return profile
 
@@ -176,9 +342,6 @@ class DatabaseHelper:
     def update_user_profile(self, user_id, contact, city, country, occupation, profile_image=None):
         """Update user profile data"""
         try:
-            # Use existing connection instead of creating new one
-            cursor = self.conn.cursor()
-
             # Build the update query dynamically based on provided fields
             update_fields = []
             values = []
@@ -200,8 +363,10 @@ class DatabaseHelper:
                 values.append(occupation)
 
             if profile_image is not None:
-                update_fields.append("profile_image = ?")
-                values.append(profile_image)
+                # Keep only the digest in the row; the bytes go to the media store
+                update_fields.append("profile_image = NULL")
+                update_fields.append("profile_image_hash = ?")
+                values.append(self.media.put(profile_image))
 
             if not update_fields:
                 return False
@@ -217,10 +382,11 @@ class DatabaseHelper:
 
             print("Profile updated successfully for user_id:", user_id)
 
-            cursor.execute(query, values)
-            self.conn.commit()  # Commit on self.conn
+            updated = self.write(
+                lambda cursor: cursor.execute(query, values).rowcount).result()
+            self.profile_cache.invalidate(user_id)
 
-            success = cursor.rowcount > 0
+            success = updated > 0
 
             # Don't close the cursor or connection
             return success
@@ -229,23 +395,75 @@ class DatabaseHelper:
             print(f"Error updating profile: {e}")
             return False
 
+    def save_onboarding_profile(self, user_id, full_name, contact, city, country, occupation):
+        """Create or update a profile from the onboarding form"""
+        try:
+            if not self.write(self._save_onboarding_profile, user_id, full_name,
+                              contact, city, country, occupation).result():
+                print(f"Error: User with ID {user_id} not found in database!")
+                return False
+
+            self.profile_cache.invalidate(user_id)
+            print(f"User Profile Saved for ID: {user_id}")
+            return True
+        except Exception as e:
+            print(f"Error saving user profile: {e}")
+            return False
+
+    def _save_onboarding_profile(self, cursor, user_id, full_name, contact, city,
+                                 country, occupation):
+        # First, get username and email from users table
+        cursor.execute(
+            'SELECT username, email FROM users WHERE id = ?', (user_id,))
+        user_data = cursor.fetchone()
+
+        if not user_data:
+            return False
+
+        username, email = user_data
+
+        # Insert the profile, or update the one get_user_profile created
+        cursor.execute('''
+                INSERT INTO user_profiles
+                (user_id, full_name, username, email, contact, city, country, occupation)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    full_name = excluded.full_name,
+                    username = excluded.username,
+                    email = excluded.email,
+                    contact = excluded.contact,
+                    city = excluded.city,
+                    country = excluded.country,
+                    occupation = excluded.occupation
+        ''', (user_id, full_name, username, email, contact, city, country, occupation))
+        return True
+
+    def profile_cache_stats(self):
+        """Hit/miss counters and size of the profile cache"""
+        return self.profile_cache.stats()
+
     def initialize_user_task(self, user_id, task="Start your climate journey by measuring your carbon footprint using an online calculator.", task_points=20):
         """Initialize a new user's task after registration"""
-        try:
+        def insert_task(cursor):
             # Check if user already has task data
-            self.cursor.execute(
+            cursor.execute(
                 'SELECT user_id FROM task_management WHERE user_id = ?', (user_id,))
-            if self.cursor.fetchone():
-                print(f"User {user_id} already has task data")
-                return True
+            if cursor.fetchone():
+                return False
 
             # Create new task entry WITH ZERO ACCUMULATED POINTS
-            self.cursor.execute(
+            cursor.execute(
                 'INSERT INTO task_management (user_id, current_task, points, num_tasks_completed) VALUES (?, ?, ?, ?)',
                 (user_id, task, 0, 0)  # Initialize points to 0
             )
-            self.conn.commit()
-            print(f"Task initialized for user {user_id}")
+            self._refresh_leaderboard_entry(cursor, user_id)
+            return True
+
+        try:
+            if self.write(insert_task).result():
+                print(f"Task initialized for user {user_id}")
+            else:
+                print(f"User {user_id} already has task data")
             return True
         except Exception as e:
             print(f"Error initializing user task: {e}")
@@ -277,11 +495,10 @@ class DatabaseHelper:
         """Update a user's current task without changing points"""
         try:
             # Only update the task, not the points
-            self.cursor.execute(
+            self.write(lambda cursor: cursor.execute(
                 'UPDATE task_management SET current_task = ? WHERE user_id = ?',
                 (new_task, user_id)
-            )
-            self.conn.commit()
+            )).result()
             return True
         except Exception as e:
             print(f"Error updating user task: {e}")
@@ -290,42 +507,92 @@ class DatabaseHelper:
     def complete_task(self, user_id, task_points=20):
         """Mark a task as completed, update points and task count"""
         try:
-            # Get current values
-            self.cursor.execute(
-                'SELECT points, num_tasks_completed FROM task_management WHERE user_id = ?',
-                (user_id,)
-            )
-            task_data = self.cursor.fetchone()
+            totals = self.write(
+                self._award_task_points, user_id, task_points).result()
 
-            if not task_data:
+            if not totals:
                 print(f"No task data found for user {user_id}")
                 return False
 
-            current_points, completed_count = task_data
-
-            # Add task points to the accumulated points
-            new_points = current_points + task_points
-
-            # Update counters and generate new task
-            new_task = "You've completed the task! Generate a new one with the Change Task button."
-
-            self.cursor.execute(
-                '''UPDATE task_management 
-                   SET points = ?,
-                       num_tasks_completed = ?, 
-                       current_task = ? 
-                   WHERE user_id = ?''',
-                (new_points, completed_count + 1, new_task, user_id)
-            )
-            self.conn.commit()
             print(
-                f"Task completed for user {user_id}. Total points: {new_points}, Tasks: {completed_count + 1}")
+                f"Task completed for user {user_id}. Total points: {totals[0]}, Tasks: {totals[1]}")
 
             return True
         except Exception as e:
             print(f"Error completing task: {e}")
             return False
 
+    def complete_tasks_bulk(self, completions, task_points=20):
+        """Award many task completions in a single transaction
+
+        completions holds user ids, or (user_id, points) pairs to override
+        task_points per entry. Returns {user_id: (points, num_tasks_completed)}
+        for every user that was awarded; nothing is written if any award fails.
+        """
+        def award_all(cursor):
+            awarded = {}
+            for entry in completions:
+                user_id, points = entry if isinstance(
+                    entry, (tuple, list)) else (entry, task_points)
+                totals = self._award_task_points(cursor, user_id, points)
+                if totals:
+                    awarded[user_id] = totals
+                else:
+                    print(f"No task data found for user {user_id}")
+            return awarded
+
+        try:
+            # One write operation, so a failure rolls back every award
+            awarded = self.write(award_all).result()
+            print(f"Bulk completion awarded points to {len(awarded)} users")
+            return awarded
+        except Exception as e:
+            print(f"Error completing tasks in bulk: {e}")
+            return {}
+
+    def _award_task_points(self, cursor, user_id, task_points):
+        """Add points and a completed task in one statement; a write operation
+
+        Returns the new (points, num_tasks_completed), or None if the user has
+        no task row. Doing the arithmetic in SQL avoids the lost update that a
+        separate SELECT and UPDATE would allow.
+        """
+        new_task = "You've completed the task! Generate a new one with the Change Task button."
+
+        cursor.execute(
+            '''UPDATE task_management 
+               SET points = points + ?,
+                   num_tasks_completed = num_tasks_completed + 1, 
+                   current_task = ? 
+               WHERE user_id = ?
+               RETURNING points, num_tasks_completed''',
+            (task_points, new_task, user_id)
+        )
+        # Drain the RETURNING rows so the statement is finished before commit
+        rows = cursor.fetchall()
+        if not rows:
+            return None
+
+        points, completed_count = rows[0]
+
+        # Keep the materialized leaderboard in step
+        cursor.execute(
+            'UPDATE leaderboard SET points = ?, num_tasks_completed = ? WHERE user_id = ?',
+            (points, completed_count, user_id))
+        if cursor.rowcount == 0:
+            self._refresh_leaderboard_entry(cursor, user_id)
+
+        # Add to today's bucket for the weekly and monthly leaderboards
+        cursor.execute('''
+            INSERT INTO points_daily (user_id, day, points, tasks)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT (user_id, day) DO UPDATE SET
+                points = points + excluded.points,
+                tasks = tasks + 1
+        ''', (user_id, date.today().isoformat(), task_points))
+
+        return points, completed_count
+
     def get_user_stats(self, user_id):
         """Get user's points and completed task count"""
         try:
@@ -343,11 +610,180 @@ class DatabaseHelper:
             print(f"Error getting user stats: {e}")
             return (0, 0)
 
+    def get_user_aggregates(self, user_id):
+        """Get (submissions, upvotes_received, last_submission_date) for a user"""
+        return self.get_user_aggregates_many([user_id]).get(user_id, (0, 0, None))
+
+    def get_user_aggregates_many(self, user_ids):
+        """Get user_id -> (submissions, upvotes_received, last_submission_date)
+
+        Read from the trigger-maintained user_aggregates table; users who
+        never posted are left out.
+        """
+        user_ids = list(dict.fromkeys(uid for uid in user_ids if uid is not None))
+        aggregates = {}
+        try:
+            cursor = self.conn.cursor()
+            for start in range(0, len(user_ids), 500):
+                chunk = user_ids[start:start + 500]
+                cursor.execute(f'''
+                    SELECT user_id, submissions, upvotes_received, last_submission_date
+                    FROM user_aggregates
+                    WHERE user_id IN ({", ".join("?" * len(chunk))})
+                ''', chunk)
+                for user_id, *values in cursor.fetchall():
+                    aggregates[user_id] = tuple(values)
+            return aggregates
+        except Exception as e:
+            print(f"Error getting user aggregates: {e}")
+            return aggregates
+
+    def _refresh_leaderboard_entry(self, cursor, user_id):
+        """Copy one user's current totals into the leaderboard table"""
+        cursor.execute('''
+            INSERT INTO leaderboard (user_id, username, points, num_tasks_completed)
+            SELECT t.user_id, u.username, t.points, t.num_tasks_completed
+            FROM task_management t
+            JOIN users u ON u.id = t.user_id
+            WHERE t.user_id = ?
+            ON CONFLICT(user_id) DO UPDATE SET
+                username = excluded.username,
+                points = excluded.points,
+                num_tasks_completed = excluded.num_tasks_completed
+        ''', (user_id,))
+
+    def rebuild_leaderboard(self):
+        """Recreate the leaderboard table from task_management"""
+        def rebuild(cursor):
+            cursor.execute('DELETE FROM leaderboard')
+            cursor.execute('''
+                INSERT INTO leaderboard (user_id, username, points, num_tasks_completed)
+                SELECT t.user_id, u.username, t.points, t.num_tasks_completed
+                FROM task_management t
+                JOIN users u ON u.id = t.user_id
+            ''')
+
+        try:
+            self.write(rebuild).result()
+            return True
+        except Exception as e:
+            print(f"Error rebuilding leaderboard: {e}")
+            return False
+
+    def get_leaderboard(self, limit=50, days=None):
+        """Get the top users as (username, points, num_tasks_completed, user_id)
+
+        With days set, points and tasks only count completions from the last
+        that many days (today included), summed from the points_daily buckets.
+        """
+        if days:
+            return self._get_window_leaderboard(limit, days)
+
+        try:
+            cursor = self.conn.cursor()
+            # Walks idx_leaderboard_rank from the top, no sort needed
+            cursor.execute('''
+                SELECT username, points, num_tasks_completed, user_id
+                FROM leaderboard
+                ORDER BY points DESC, user_id
+                LIMIT ?
+            ''', (limit,))
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"Error getting leaderboard: {e}")
+            return []
+
+    def get_user_rank(self, user_id, days=None):
+        """Get (rank, points, num_tasks_completed) for one user, or None
+
+        Ties are ordered by user_id, the same as get_leaderboard. With days
+        set the rank is within that window; None if the user scored nothing.
+        """
+        if days:
+            return self._get_window_rank(user_id, days)
+
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                'SELECT points, num_tasks_completed FROM leaderboard WHERE user_id = ?',
+                (user_id,))
+            entry = cursor.fetchone()
+            if not entry:
+                return None
+
+            points, tasks_completed = entry
+            # Two index range counts instead of ranking the whole table
+            cursor.execute('''
+                SELECT (SELECT COUNT(*) FROM leaderboard WHERE points > ?)
+                     + (SELECT COUNT(*) FROM leaderboard WHERE points = ? AND user_id < ?)
+            ''', (points, points, user_id))
+            return (cursor.fetchone()[0] + 1, points, tasks_completed)
+        except Exception as e:
+            print(f"Error getting user rank: {e}")
+            return None
+
+    def _window_start(self, days):
+        """First day, as stored in points_daily, of a window ending today"""
+        return (date.today() - timedelta(days=days - 1)).isoformat()
+
+    def _get_window_leaderboard(self, limit, days):
+        try:
+            cursor = self.conn.cursor()
+            # Only the buckets inside the window are read. Left alone the
+            # planner scans the primary key to avoid sorting for the GROUP BY,
+            # which reads every day ever recorded, hence INDEXED BY.
+            cursor.execute('''
+                SELECT u.username, w.points, w.tasks, w.user_id
+                FROM (
+                    SELECT user_id, SUM(points) AS points, SUM(tasks) AS tasks
+                    FROM points_daily INDEXED BY idx_points_daily_day
+                    WHERE day >= ?
+                    GROUP BY user_id
+                ) w
+                JOIN users u ON u.id = w.user_id
+                ORDER BY w.points DESC, w.user_id
+                LIMIT ?
+            ''', (self._window_start(days), limit))
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"Error getting windowed leaderboard: {e}")
+            return []
+
+    def _get_window_rank(self, user_id, days):
+        try:
+            cursor = self.conn.cursor()
+            start = self._window_start(days)
+            cursor.execute('''
+                SELECT SUM(points), SUM(tasks) FROM points_daily
+                WHERE user_id = ? AND day >= ?
+            ''', (user_id, start))
+            points, tasks_completed = cursor.fetchone()
+            if points is None:
+                return None
+
+            cursor.execute('''
+                SELECT COUNT(*) FROM (
+                    SELECT user_id, SUM(points) AS points
+                    FROM points_daily INDEXED BY idx_points_daily_day
+                    WHERE day >= ?
+                    GROUP BY user_id
+                )
+                WHERE points > ? OR (points = ? AND user_id < ?)
+            ''', (start, points, points, user_id))
+            return (cursor.fetchone()[0] + 1, points, tasks_completed)
+        except Exception as e:
+            print(f"Error getting windowed user rank: {e}")
+            return None
+
     def reset_user_points(self):
         """Reset points for all users to fix existing data"""
+        def reset(cursor):
+            cursor.execute('UPDATE task_management SET points = 0')
+            cursor.execute('UPDATE leaderboard SET points = 0')
+            cursor.execute('DELETE FROM points_daily')
+
         try:
-            self.cursor.execute('UPDATE task_management SET points = 0')
-            self.conn.commit()
+            self.write(reset).result()
             print("All user points have been reset")
             return True
         except Exception as e:
@@ -358,20 +794,20 @@ class DatabaseHelper:
                        location_text=None, description=None, submission_date=None):
         """Add a new task submission from a user"""
         try:
-            # Use existing connection
-            cursor = self.conn.cursor()
+            # Images are written to the media store, the row keeps the digest
+            image_hash = self.media.put(image) if image else None
+            # The feed pages on (submission_date, id), which needs a date
+            submission_date = submission_date or date.today().isoformat()
 
-            cursor.execute('''
+            self.write(lambda cursor: cursor.execute('''
                 INSERT INTO user_submissions (
-                    user_id, task_text, image, latitude, longitude, 
+                    user_id, task_text, image_hash, latitude, longitude, 
                     location_text, description, submission_date, upvotes
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
-                user_id, task_text, image, latitude, longitude,
+                user_id, task_text, image_hash, latitude, longitude,
                 location_text, description, submission_date, 0
-            ))
-
-            self.conn.commit()
+            ))).result()
 
             print(f"Submission added for user {user_id}")
             return True
@@ -381,52 +817,502 @@ class DatabaseHelper:
 
     def get_user_submissions(self, user_id=None, limit=10):
         """Get user submissions, optionally filtered by user_id"""
+        rows, _ = self.get_submissions_page(user_id=user_id, limit=limit)
+        return rows
+
+    def get_submissions_page(self, user_id=None, cursor=None, limit=10):
+        """Get one page of submissions, newest first, using keyset pagination
+
+        cursor is the (submission_date, id) of the last row on the previous
+        page. Returns (rows, next_cursor); next_cursor is None on the last page.
+        Rows without a submission_date come last.
+        """
+        rows, next_cursor = self._query_submission_page(
+            'image', user_id, cursor, limit)
+        # Swap the image column for the bytes, wherever they are stored
+        rows = [row[:3] + (self._read_submission_image(row[0], row[3], image_hash),)
+                + row[4:] for row, image_hash in rows]
+        return rows, next_cursor
+
+    def get_submissions_metadata(self, user_id=None, cursor=None, limit=10):
+        """Same as get_submissions_page but without the image BLOB
+
+        Rows keep the usual shape; the image column is replaced by a has_image
+        flag. Fetch the picture itself with get_submission_image when it is shown.
+        """
+        rows, next_cursor = self._query_submission_page(
+            '(image IS NOT NULL OR image_hash IS NOT NULL) AS has_image',
+            user_id, cursor, limit)
+        return [row for row, _ in rows], next_cursor
+
+    def _query_submission_page(self, image_column, user_id, cursor, limit):
+        """Run the keyset page query with the given image column expression
+
+        Rows come back as (row, image_hash) pairs. Archived rows are merged
+        in whenever the page reaches back to the newest archived date. That
+        happens before the hot table runs out too, since a submission can
+        be backdated past rows that were already archived.
+        """
+        try:
+            # Fetch one extra row to find out whether another page exists
+            rows = self._select_page_rows(
+                self.conn, 'main', image_column, user_id, cursor, limit + 1)
+
+            newest_archived = self._newest_archived_date()
+            if newest_archived is not None and (
+                    len(rows) <= limit or (rows[-1][8] or "") <= newest_archived):
+                rows = self._extend_from_archives(
+                    rows, image_column, user_id, cursor, limit + 1)
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = (last[8], last[0])
+
+            rows = self._with_pending_upvotes(rows)
+            return [(row[:10], row[10]) for row in rows], next_cursor
+        except Exception as e:
+            print(f"Error getting submissions: {e}")
+            return [], None
+
+    def _with_pending_upvotes(self, rows):
+        """Add upvotes still waiting in the buffer to submission rows
+
+        Rows start with id and carry upvotes at index 9; any further
+        columns are passed through.
+        """
+        if not self.upvotes.has_pending():
+            return rows
+        return [row[:9] + (row[9] + self.upvotes.pending_for(row[0]),) + row[10:]
+                for row in rows]
+
+    def _select_page_rows(self, conn, schema, image_column, user_id, cursor, limit):
+        """Keyset page query against user_submissions in one attached schema
+
+        Undated rows sort after every dated one. A NULL date never matches
+        the row-value comparison, so once the dated rows run out the page
+        continues with a second seek into the undated tail.
+        """
+        if cursor and cursor[0] is None:
+            # The previous page already ended in the undated tail
+            return self._select_rows(conn, schema, image_column, user_id,
+                                     "submission_date IS NULL AND id < ?",
+                                     [cursor[1]], limit)
+
+        # Row-value comparison lets SQLite seek straight to the cursor
+        rows = self._select_rows(conn, schema, image_column, user_id,
+                                 "(submission_date, id) < (?, ?)" if cursor else None,
+                                 list(cursor) if cursor else [], limit)
+        if cursor and len(rows) < limit:
+            rows += self._select_rows(conn, schema, image_column, user_id,
+                                      "submission_date IS NULL", [],
+                                      limit - len(rows))
+        return rows
+
+    def _select_rows(self, conn, schema, image_column, user_id, condition, params, limit):
+        conditions = []
+        params = list(params)
+
+        if user_id:
+            conditions.append("user_id = ?")
+            params.insert(0, user_id)
+
+        if condition:
+            conditions.append(condition)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        db_cursor = conn.cursor()
+        db_cursor.execute(f'''
+            SELECT id, user_id, task_text, {image_column}, latitude, longitude,
+                   location_text, description, submission_date, upvotes,
+                   image_hash
+            FROM {schema}.user_submissions
+            {where}
+            ORDER BY submission_date DESC, id DESC
+            LIMIT ?
+        ''', params + [limit])
+        return db_cursor.fetchall()
+
+    def _extend_from_archives(self, rows, image_column, user_id, cursor, wanted):
+        """Top up a page from the archive files, newest period first"""
+        archives = list_archives(self.archive_dir)
+        if not archives:
+            return rows
+
+        conn = self.conn
+        seen = {row[0] for row in rows}
+        archived = []
+        for period, path in archives:
+            schema = self._attach_archive(conn, period, path)
+            for row in self._select_page_rows(
+                    conn, schema, image_column, user_id, cursor, wanted):
+                # A row copied but not yet removed from the hot table by an
+                # interrupted archive run is shown once, from the hot table
+                if row[0] not in seen:
+                    seen.add(row[0])
+                    archived.append(row)
+            # Periods do not overlap, so once the newer archives fill the
+            # page no row from an older one can make it in
+            if len(archived) >= wanted:
+                break
+
+        rows = sorted(rows + archived, key=lambda row: (row[8] or "", row[0]),
+                      reverse=True)
+        return rows[:wanted]
+
+    def _newest_archived_date(self):
+        """submission_date of the newest archived row, None without archives
+
+        Read once per archive file and again only after the file changes.
+        """
+        for period, path in list_archives(self.archive_dir):
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            bound = self._archive_bounds.get(path)
+            if bound is None or bound[0] != mtime:
+                schema = self._attach_archive(self.conn, period, path)
+                newest = self.conn.execute(
+                    f"SELECT MAX(submission_date) FROM {schema}.user_submissions"
+                ).fetchone()[0]
+                bound = self._archive_bounds[path] = (mtime, newest)
+            # Newest period first, so the first non-empty archive decides
+            if bound[1] is not None:
+                return bound[1]
+        return None
+
+    def get_archived_ids(self, submission_ids):
+        """The ids among submission_ids that only exist in the archives
+
+        Archived submissions are read-only, so the feed hides their upvote
+        button.
+        """
+        submission_ids = list(dict.fromkeys(submission_ids))
+        if not submission_ids or not list_archives(self.archive_dir):
+            return set()
+        try:
+            live = set()
+            for start in range(0, len(submission_ids), 500):
+                chunk = submission_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                live.update(row[0] for row in self.conn.execute(
+                    f"SELECT id FROM user_submissions WHERE id IN ({placeholders})",
+                    chunk))
+            return set(submission_ids) - live
+        except Exception as e:
+            print(f"Error checking archived submissions: {e}")
+            return set()
+
+    def _attach_archive(self, conn, period, path):
+        """ATTACH an archive file to this thread's connection if needed
+
+        Returns the schema name to query. SQLite allows only a handful of
+        attached databases, so the oldest attachment is dropped when full.
+        """
+        schema = "archive_" + period.replace("-", "_")
+        attached = [row[1] for row in conn.execute("PRAGMA database_list")
+                    if row[1].startswith("archive_")]
+        if schema in attached:
+            return schema
+        if len(attached) >= MAX_ATTACHED_ARCHIVES:
+            conn.execute(f"DETACH DATABASE {attached[0]}")
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+        return schema
+
+    def get_submissions_in_bbox(self, min_lat, min_lon, max_lat, max_lon, limit=200):
+        """Get the newest submissions located inside a bounding box
+
+        Rows have the get_submissions_metadata shape. The box is looked up in
+        the submissions_rtree index, so the cost follows the number of posts
+        in view rather than the size of the table. A box with min_lon greater
+        than max_lon is taken to cross the antimeridian.
+        """
         try:
-            # Use existing connection
             cursor = self.conn.cursor()
 
-            if user_id:
-                cursor.execute('''
-                    SELECT id, user_id, task_text, image, latitude, longitude, 
-                           location_text, description, submission_date, upvotes
-                    FROM user_submissions 
-                    WHERE user_id = ?
-                    ORDER BY submission_date DESC
-                    LIMIT ?
-                ''', (user_id, limit))
+            if min_lon <= max_lon:
+                lon_ranges = [(min_lon, max_lon)]
             else:
-                cursor.execute('''
-                    SELECT id, user_id, task_text, image, latitude, longitude, 
-                           location_text, description, submission_date, upvotes
-                    FROM user_submissions 
-                    ORDER BY submission_date DESC
-                    LIMIT ?
-                ''', (limit,))
-
-            return cursor.fetchall()
+                lon_ranges = [(min_lon, 180.0), (-180.0, max_lon)]
+
+            # The R*Tree keeps 32-bit floats rounded outwards, so points
+            # right on the edge of the box may be included as well
+            matches = []
+            params = []
+            for range_min, range_max in lon_ranges:
+                matches.append('''
+                    SELECT id FROM submissions_rtree
+                    WHERE max_lat >= ? AND min_lat <= ?
+                      AND max_lon >= ? AND min_lon <= ?
+                ''')
+                params.extend([min_lat, max_lat, range_min, range_max])
+
+            cursor.execute(f'''
+                SELECT id, user_id, task_text,
+                       (image IS NOT NULL OR image_hash IS NOT NULL) AS has_image,
+                       latitude, longitude, location_text, description,
+                       submission_date, upvotes
+                FROM user_submissions
+                WHERE id IN ({' UNION ALL '.join(matches)})
+                ORDER BY submission_date DESC, id DESC
+                LIMIT ?
+            ''', params + [limit])
+            rows = cursor.fetchall()
+
+            return self._with_pending_upvotes(rows)
         except Exception as e:
-            print(f"Error getting submissions: {e}")
+            print(f"Error getting submissions in bounding box: {e}")
             return []
 
-    def upvote_submission(self, submission_id):
-        """Increase the upvote count for a submission"""
+    def search_submissions(self, query, user_id=None, offset=0, limit=10):
+        """Find submissions matching keywords, best matches first
+
+        Every word in the query must appear in the task, description or
+        location; the last word also matches as a prefix, so partial input
+        works while typing. Rows have the get_submissions_metadata shape.
+        Returns (rows, next_offset); next_offset is None on the last page.
+        """
+        terms = re.findall(r"\w+", query or "")
+        if not terms:
+            return [], None
+
+        # Quote every word so user input can never be read as FTS syntax
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+
+        try:
+            cursor = self.conn.cursor()
+
+            user_filter = ""
+            params = [match]
+            if user_id:
+                user_filter = "AND s.user_id = ?"
+                params.append(user_id)
+
+            # Weights: task text counts most, then location, then description
+            cursor.execute(f'''
+                SELECT s.id, s.user_id, s.task_text,
+                       (s.image IS NOT NULL OR s.image_hash IS NOT NULL) AS has_image,
+                       s.latitude, s.longitude, s.location_text, s.description,
+                       s.submission_date, s.upvotes
+                FROM submissions_fts
+                JOIN user_submissions s ON s.id = submissions_fts.rowid
+                WHERE submissions_fts MATCH ? {user_filter}
+                ORDER BY bm25(submissions_fts, 3.0, 1.0, 2.0), s.id DESC
+                LIMIT ? OFFSET ?
+            ''', params + [limit + 1, offset])
+            rows = cursor.fetchall()
+
+            next_offset = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_offset = offset + limit
+
+            return self._with_pending_upvotes(rows), next_offset
+        except Exception as e:
+            print(f"Error searching submissions: {e}")
+            return [], None
+
+    def _find_submission_image(self, submission_id):
+        """(image, image_hash) of a submission, looking in the archives too"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'SELECT image, image_hash FROM user_submissions WHERE id = ?',
+            (submission_id,))
+        result = cursor.fetchone()
+        if result:
+            return result
+
+        for period, path in list_archives(self.archive_dir):
+            schema = self._attach_archive(self.conn, period, path)
+            cursor.execute(
+                f'SELECT image, image_hash FROM {schema}.user_submissions WHERE id = ?',
+                (submission_id,))
+            result = cursor.fetchone()
+            if result:
+                return result
+        return None
+
+    def get_submission_image(self, submission_id):
+        """Get the image bytes of a single submission"""
+        try:
+            result = self._find_submission_image(submission_id)
+            if not result:
+                return None
+            return self._read_submission_image(submission_id, *result)
+        except Exception as e:
+            print(f"Error getting submission image: {e}")
+            return None
+
+    def get_submission_image_path(self, submission_id):
+        """Get the media store file of a submission's image, for direct display"""
+        try:
+            result = self._find_submission_image(submission_id)
+            if not result:
+                return None
+            image, image_hash = result
+            image_hash = image_hash or self._migrate_submission_image(
+                submission_id, image)
+            return self.media.path(image_hash) if self.media.exists(image_hash) else None
+        except Exception as e:
+            print(f"Error getting submission image path: {e}")
+            return None
+
+    def get_profile_image_path(self, user_id):
+        """Get the media store file of a user's profile image, for direct display"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                'SELECT profile_image, profile_image_hash FROM user_profiles WHERE user_id = ?',
+                (user_id,))
+            result = cursor.fetchone()
+            if not result:
+                return None
+            image, image_hash = result
+            image_hash = image_hash or self._migrate_profile_image(user_id, image)
+            return self.media.path(image_hash) if self.media.exists(image_hash) else None
+        except Exception as e:
+            print(f"Error getting profile image path: {e}")
+            return None
+
+    def get_user_summaries(self, user_ids):
+        """Get username and avatar path for many users in one query
+
+        Returns a dict of user_id -> (username, profile_image_path). Meant for
+        a page of posts, so only the small columns are read, never the BLOB.
+        """
+        user_ids = list(dict.fromkeys(uid for uid in user_ids if uid is not None))
+        summaries = {}
+        if not user_ids:
+            return summaries
+
         try:
-            # Use existing connection
             cursor = self.conn.cursor()
+            # Stay well under SQLite's limit on bound parameters
+            for start in range(0, len(user_ids), 500):
+                chunk = user_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f'''
+                    SELECT u.id, COALESCE(NULLIF(p.username, ''), u.username),
+                           p.profile_image_hash, p.profile_image IS NOT NULL
+                    FROM users u
+                    LEFT JOIN user_profiles p ON p.user_id = u.id
+                    WHERE u.id IN ({placeholders})
+                ''', chunk)
+
+                for user_id, username, image_hash, has_legacy_image in cursor.fetchall():
+                    if image_hash:
+                        path = self.media.path(image_hash) if self.media.exists(image_hash) else None
+                    elif has_legacy_image:
+                        # Rare until migrate_image_blobs has run; moves the BLOB out
+                        path = self.get_profile_image_path(user_id)
+                    else:
+                        path = None
+                    summaries[user_id] = (username, path)
+
+            return summaries
+        except Exception as e:
+            print(f"Error getting user summaries: {e}")
+            return summaries
+
+    def _read_submission_image(self, submission_id, image, image_hash):
+        """Return image bytes from the media store, migrating a legacy BLOB first"""
+        if image_hash:
+            return self.media.read(image_hash)
+        if image:
+            self._migrate_submission_image(submission_id, image)
+        return image
+
+    def _migrate_submission_image(self, submission_id, image):
+        """Move one inline submission BLOB into the media store"""
+        if not image:
+            return None
+        image_hash = self.media.put(image)
+        self.write(lambda cursor: cursor.execute(
+            'UPDATE user_submissions SET image_hash = ?, image = NULL WHERE id = ?',
+            (image_hash, submission_id))).result()
+        return image_hash
+
+    def _migrate_profile_image(self, user_id, image):
+        """Move one inline profile BLOB into the media store"""
+        if not image:
+            return None
+        image_hash = self.media.put(image)
+        self.write(lambda cursor: cursor.execute(
+            'UPDATE user_profiles SET profile_image_hash = ?, profile_image = NULL WHERE user_id = ?',
+            (image_hash, user_id))).result()
+        return image_hash
+
+    def migrate_image_blobs(self, batch_size=50):
+        """Move every remaining inline image BLOB into the media store
+
+        Works in small batches so the UI thread is never blocked for long.
+        Returns the number of images moved.
+        """
+        moved = 0
+        try:
+            cursor = self.conn.cursor()
+            for table, key, blob, digest in (
+                    ('user_submissions', 'id', 'image', 'image_hash'),
+                    ('user_profiles', 'user_id', 'profile_image', 'profile_image_hash')):
+                while True:
+                    cursor.execute(
+                        f'SELECT {key}, {blob} FROM {table} WHERE {blob} IS NOT NULL LIMIT ?',
+                        (batch_size,))
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    # Files are written here, only the UPDATE goes to the writer
+                    digests = [(self.media.put(data), row_id) for row_id, data in rows]
+                    sql = f'UPDATE {table} SET {digest} = ?, {blob} = NULL WHERE {key} = ?'
+                    self.write(lambda write_cursor: write_cursor.executemany(
+                        sql, digests)).result()
+                    moved += len(rows)
+            print(f"Moved {moved} images into the media store")
+        except Exception as e:
+            print(f"Error migrating image BLOBs: {e}")
+        return moved
+
+    def apply_upvote_deltas(self, deltas):
+        """Add {submission_id: count} upvote deltas in a single transaction
+
+        Returns the set of ids that were updated, or None if the write
+        failed. Submissions no longer in the live table (archived or
+        deleted) are left out of the set.
+        """
+        def apply(cursor):
+            applied = set()
+            for submission_id, delta in deltas.items():
+                cursor.execute(
+                    'UPDATE user_submissions SET upvotes = upvotes + ? WHERE id = ?',
+                    (delta, submission_id))
+                if cursor.rowcount:
+                    applied.add(submission_id)
+            return applied
 
+        try:
+            return self.write(apply).result()
+        except Exception as e:
+            print(f"Error applying upvotes: {e}")
+            return None
+
+    def upvote_submission(self, submission_id):
+        """Increase the upvote count for a submission"""
+        def upvote(cursor):
             cursor.execute('''
                 UPDATE user_submissions 
                 SET upvotes = upvotes + 1
                 WHERE id = ?
+                RETURNING upvotes
             ''', (submission_id,))
-
-            self.conn.commit()
-
             # Return the new upvote count
-            cursor.execute('SELECT upvotes FROM user_submissions WHERE id = ?',
-                           (submission_id,))
-            result = cursor.fetchone()
-            return result[0] if result else 0
+            rows = cursor.fetchall()
+            return rows[0][0] if rows else 0
+
+        try:
+            return self.write(upvote).result()
         except Exception as e:
             print(f"Error upvoting submission: {e}")
             return 0
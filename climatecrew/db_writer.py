@@ -0,0 +1,166 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class DatabaseWriter:
+    """Runs every write on one thread and commits them in groups
+
+    Callers submit write operations, callables taking a cursor, and get a
+    Future back. The writer thread drains the queue into batches of up to
+    max_batch operations, waiting at most max_latency seconds for more to
+    arrive after the first, and commits each batch once. Every operation
+    runs in its own SAVEPOINT, so one that fails is rolled back on its own
+    without taking the rest of the batch with it.
+
+    Operations must not commit or roll back themselves. Futures resolve
+    only after their batch is committed.
+    """
+
+    def __init__(self, connections, max_batch=100, max_latency=0.005):
+        self.connections = connections
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.batches = 0
+        self.operations = 0
+        self.last_activity = time.monotonic()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, op, *args, **kwargs):
+        """Queue op(cursor, *args, **kwargs); returns a Future for its result"""
+        future = Future()
+        self.last_activity = time.monotonic()
+
+        if threading.current_thread() is self._thread:
+            # Already inside a batch (an operation calling another write):
+            # run in place, queueing would wait on ourselves forever
+            cursor = self.connections.get().cursor()
+            cursor.execute("SAVEPOINT nested_write_op")
+            try:
+                result = op(cursor, *args, **kwargs)
+                cursor.execute("RELEASE nested_write_op")
+                future.set_result(result)
+            except Exception as e:
+                cursor.execute("ROLLBACK TO nested_write_op")
+                cursor.execute("RELEASE nested_write_op")
+                future.set_exception(e)
+            return future
+
+        with self._lock:
+            if self._closed:
+                # After shutdown fall back to a plain transaction on this thread
+                self._run_direct(future, op, args, kwargs)
+                return future
+            self._ensure_thread()
+            self._queue.put((future, op, args, kwargs))
+        return future
+
+    def flush(self):
+        """Block until everything queued so far is committed"""
+        self.submit(lambda cursor: None).result()
+
+    def close(self):
+        """Commit what is queued and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
+            self._thread = None
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'operations': self.operations,
+            'average_batch': self.operations / self.batches if self.batches else 0.0,
+        }
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="db-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            # Collect whatever else arrives within the latency budget
+            batch = [item]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=max(remaining, 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch):
+        conn = self.connections.get()
+        results = []
+        try:
+            # Take the write lock up front instead of upgrading mid-batch
+            conn.execute("BEGIN IMMEDIATE")
+        except Exception as e:
+            print(f"Error starting write batch: {e}")
+            for future, _, _, _ in batch:
+                future.set_exception(e)
+            return
+
+        try:
+            cursor = conn.cursor()
+            for future, op, args, kwargs in batch:
+                cursor.execute("SAVEPOINT write_op")
+                try:
+                    result = op(cursor, *args, **kwargs)
+                    cursor.execute("RELEASE write_op")
+                    results.append((future, result))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO write_op")
+                    cursor.execute("RELEASE write_op")
+                    future.set_exception(e)
+
+            conn.commit()
+        except Exception as e:
+            print(f"Error committing write batch: {e}")
+            if conn.in_transaction:
+                conn.rollback()
+            # Nothing in the batch was committed, fail whatever has not failed
+            for future, _, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.operations += len(batch)
+        for future, result in results:
+            future.set_result(result)
+
+    def _run_direct(self, future, op, args, kwargs):
+        conn = self.connections.get()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = op(conn.cursor(), *args, **kwargs)
+            conn.commit()
+            future.set_result(result)
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            future.set_exception(e)
@@ -1,4 +1,5 @@
 import sqlite3
+from maintenance import DatabaseMaintenance
 
 conn = sqlite3.connect('user_auth.db')
 cursor = conn.cursor()
@@ -9,3 +10,6 @@ conn.commit()  # Save changes
 
 print("Database cleared successfully!")
 conn.close()
+
+# Give the freed pages back and refresh the planner stats after the bulk delete
+DatabaseMaintenance('user_auth.db', time_budget=5.0).run()
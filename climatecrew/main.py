@@ -14,6 +14,9 @@ from screens.map import MapScreen
 from screens.leaderboard import LeaderboardScreen
 from kivy.core.text import LabelBase
 from db_helper import DatabaseHelper
+from async_db import AsyncDatabaseHelper
+from maintenance import DatabaseMaintenance
+import threading
 
 # Set the app to mobile dimensions for testing
 Window.size = (360, 640)
@@ -48,27 +51,44 @@ class ClimateCrewApp(MDApp):
 
     def build(self):
         self.db_helper = DatabaseHelper()
+        # Move any images still stored as BLOBs into the media store without
+        # holding up startup; the worker gets its own connection
+        threading.Thread(target=self.db_helper.migrate_image_blobs,
+                         daemon=True).start()
+        # Screens run their queries through this so frames never wait on SQLite
+        self.async_db = AsyncDatabaseHelper(self.db_helper)
+        # ANALYZE, vacuum and WAL checkpoints while the user is not writing
+        # The one-time full VACUUM is left to maintenance.py and
+        # delete_rows.py: it has no time budget and would lock out writes
+        self.maintenance = DatabaseMaintenance(
+            self.db_helper.db_path, is_idle=self.db_helper.is_idle,
+            allow_vacuum=False)
+        self.maintenance.start()
         # Create the screen manager
         sm = ScreenManager(transition=SlideTransition())
 
         # Add screens
-        login_screen = LoginScreen(self.db_helper, name='login')
-        register_screen = RegistrationScreen(self.db_helper, name='register')
+        login_screen = LoginScreen(
+            self.db_helper, async_db=self.async_db, name='login')
+        register_screen = RegistrationScreen(
+            self.db_helper, async_db=self.async_db, name='register')
         home_screen = HomeScreen(
-            db_helper=self.db_helper, name='home')
+            db_helper=self.db_helper, async_db=self.async_db, name='home')
         profile_screen = ProfileScreen(self.db_helper, name='profile')
         news_screen = NewsScreen(name='news')
         submit_task_screen = SubmitTaskScreen(
             self.db_helper, name='submit_task')
-        social_screen = SocialScreen(self.db_helper, name='social')
-        map_screen = MapScreen(self.db_helper, name='map')
+        social_screen = SocialScreen(
+            self.db_helper, async_db=self.async_db, name='social')
+        map_screen = MapScreen(
+            self.db_helper, async_db=self.async_db, name='map')
         leaderboard_screen = LeaderboardScreen(
-            self.db_helper, name='leaderboard')
+            self.db_helper, async_db=self.async_db, name='leaderboard')
         sm.add_widget(WelcomeScreen())
         sm.add_widget(login_screen)
         sm.add_widget(register_screen)
         sm.add_widget(home_screen)
-        sm.add_widget(OnboardingScreen())
+        sm.add_widget(OnboardingScreen(self.db_helper))
         sm.add_widget(profile_screen)
         sm.add_widget(news_screen)
         sm.add_widget(submit_task_screen)
@@ -81,6 +101,11 @@ class ClimateCrewApp(MDApp):
     def on_stop(self):
         """Called when the application is closing"""
         if self.db_helper:
+            self.maintenance.stop()
+            # Let queued background queries finish first
+            self.async_db.shutdown()
+            # Flush buffered upvotes before closing the connections
+            self.db_helper.upvotes.flush()
             self.db_helper.close()
             print("Database connection closed")
 
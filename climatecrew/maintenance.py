@@ -0,0 +1,230 @@
+"""Background SQLite housekeeping: planner statistics, incremental vacuum
+and WAL checkpoints
+
+DatabaseMaintenance runs on its own connection, only once the app has been
+idle for a while, and stops the budgeted steps as soon as its time budget
+is spent. Each run returns a report of what it did.
+
+Usage:
+    python maintenance.py --db user_auth.db --budget-ms 2000
+"""
+import os
+import sqlite3
+import threading
+import time
+
+# Rows ANALYZE samples per index. Approximate statistics are plenty for
+# the planner and keep a pass over the whole schema in the milliseconds.
+ANALYSIS_LIMIT = 400
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class DatabaseMaintenance:
+    """Refreshes planner stats, returns free pages to the OS and checkpoints
+
+    Each run():
+      1. switches the database to auto_vacuum=incremental the first time,
+         which needs one full VACUUM (skipped when allow_vacuum is False)
+      2. runs ANALYZE table by table until the time budget is spent
+      3. runs incremental_vacuum in steps until the freelist is empty or
+         the budget is spent
+      4. checkpoints and truncates the WAL so the file actually shrinks
+
+    start() runs it every `interval` seconds on a daemon thread, but only
+    when is_idle(idle_seconds) says nobody is using the database; otherwise
+    it tries again after idle_seconds. Background schedulers should pass
+    allow_vacuum=False: the full VACUUM is not budgeted and holds the write
+    lock for as long as it takes to rewrite the file. Run it from the
+    command line or delete_rows.py instead.
+    """
+
+    def __init__(self, db_path, is_idle=None, interval=3600, idle_seconds=30,
+                 time_budget=0.5, vacuum_step=256, allow_vacuum=True):
+        self.db_path = db_path
+        self.is_idle = is_idle or (lambda seconds: True)
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.time_budget = time_budget
+        self.vacuum_step = vacuum_step
+        self.allow_vacuum = allow_vacuum
+        self.last_report = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def start(self):
+        """Run maintenance in the background until stop()
+
+        Safe to call repeatedly and from several threads; only the first
+        call starts the scheduler.
+        """
+        with self._thread_lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="db-maintenance", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._thread_lock:
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+
+    def run_if_idle(self):
+        """Run now if the database is idle; returns the report or None"""
+        if not self.is_idle(self.idle_seconds):
+            return None
+        return self.run()
+
+    def run(self):
+        """Run every step once and return a report dict"""
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        report = {
+            'vacuumed': False,
+            'analyzed': [],
+            'stats_changed': 0,
+            'pages_freed': 0,
+            'bytes_reclaimed': 0,
+            'checkpoint': None,
+            'budget_exhausted': False,
+        }
+        size_before = self._file_size()
+
+        conn = sqlite3.connect(self.db_path, timeout=1.0, isolation_level=None)
+        try:
+            # Back off quickly: this is housekeeping, real users come first
+            conn.execute("PRAGMA busy_timeout = 1000")
+            conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+
+            report['vacuumed'] = self._enable_incremental_vacuum(conn)
+            self._analyze(conn, deadline, report)
+            self._incremental_vacuum(conn, deadline, report)
+
+            busy, wal_pages, checkpointed = conn.execute(
+                "PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            report['checkpoint'] = {
+                'busy': bool(busy), 'wal_pages': wal_pages,
+                'checkpointed': checkpointed}
+        except sqlite3.Error as e:
+            print(f"Database maintenance error: {e}")
+            report['error'] = str(e)
+        finally:
+            conn.close()
+
+        report['bytes_reclaimed'] = max(size_before - self._file_size(), 0)
+        report['elapsed_ms'] = round((time.monotonic() - started) * 1000, 1)
+        print(f"Database maintenance: analyzed {len(report['analyzed'])} tables "
+              f"({report['stats_changed']} stats changed), freed "
+              f"{report['pages_freed']} pages, reclaimed "
+              f"{report['bytes_reclaimed']} bytes in {report['elapsed_ms']} ms")
+        self.last_report = report
+        return report
+
+    def _run(self):
+        wait = self.interval
+        while not self._stop.wait(wait):
+            try:
+                report = self.run_if_idle()
+            except Exception as e:
+                print(f"Database maintenance error: {e}")
+                report = {}
+            # Busy: look again shortly instead of waiting a whole interval
+            wait = self.interval if report is not None else self.idle_seconds
+
+    def _file_size(self):
+        total = 0
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _enable_incremental_vacuum(self, conn):
+        """Switch to auto_vacuum=incremental; True if a VACUUM was needed"""
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode == AUTO_VACUUM_INCREMENTAL:
+            return False
+        if not self.allow_vacuum:
+            print("Database maintenance: auto_vacuum is not incremental yet, "
+                  "run maintenance.py once to convert it")
+            return False
+        # NONE -> INCREMENTAL only takes effect after rebuilding the file.
+        # This rewrites the whole database once and is not budgeted.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+
+    def _analyze(self, conn, deadline, report):
+        """ANALYZE one table at a time until the deadline"""
+        before = self._stat_snapshot(conn)
+        tables = [row[0] for row in conn.execute('''
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+              AND sql NOT LIKE 'CREATE VIRTUAL%'
+            ORDER BY name
+        ''')]
+
+        # The progress handler aborts an ANALYZE that runs past the deadline
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        try:
+            for table in tables:
+                if time.monotonic() > deadline:
+                    report['budget_exhausted'] = True
+                    break
+                try:
+                    conn.execute(f'ANALYZE "{table}"')
+                    report['analyzed'].append(table)
+                except sqlite3.OperationalError as e:
+                    if "interrupted" not in str(e):
+                        raise
+                    report['budget_exhausted'] = True
+                    break
+        finally:
+            conn.set_progress_handler(None, 0)
+
+        after = self._stat_snapshot(conn)
+        report['stats_changed'] = len(set(after.items()) ^ set(before.items()))
+
+    def _stat_snapshot(self, conn):
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        if not exists:
+            return {}
+        return {(tbl, idx): stat for tbl, idx, stat in
+                conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1")}
+
+    def _incremental_vacuum(self, conn, deadline, report):
+        """Release free pages a step at a time until the deadline"""
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            return
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        free = free_before
+        while free:
+            if time.monotonic() > deadline:
+                report['budget_exhausted'] = True
+                break
+            conn.execute(f"PRAGMA incremental_vacuum({self.vacuum_step})").fetchall()
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        report['pages_freed'] = free_before - free
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Analyze, vacuum and checkpoint a ClimateCrew database")
+    parser.add_argument("--db", default="user_auth.db")
+    parser.add_argument("--budget-ms", type=float, default=2000,
+                        help="time budget for ANALYZE and vacuum (default: 2000)")
+    parser.add_argument("--no-vacuum", action="store_true",
+                        help="do not run the one-time full VACUUM")
+    args = parser.parse_args()
+
+    maintenance = DatabaseMaintenance(
+        args.db, time_budget=args.budget_ms / 1000, allow_vacuum=not args.no_vacuum)
+    print(maintenance.run())
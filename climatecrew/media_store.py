@@ -0,0 +1,66 @@
+import hashlib
+import mmap
+import os
+import tempfile
+
+
+class MediaStore:
+    """Content-addressed image files, named by the SHA-256 of their bytes"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, digest):
+        """Path of the file holding the given digest"""
+        # Fan out on the first two hex characters to keep directories small
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest):
+        return bool(digest) and os.path.exists(self.path(digest))
+
+    def put(self, data):
+        """Store the bytes and return their digest; identical data is stored once"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+
+        if os.path.exists(path):
+            return digest
+
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial image
+        fd, temp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return digest
+
+    def open(self, digest):
+        """Memory-map the file for the digest read-only, or None if missing"""
+        if not self.exists(digest):
+            return None
+
+        with open(self.path(digest), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None  # Empty files cannot be mapped
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, digest):
+        """Return the bytes for the digest, or None if missing
+
+        Callers need a bytes object anyway, and slicing a map copies it,
+        so a plain read is cheaper. Use open() to work on the map itself.
+        """
+        if not self.exists(digest):
+            return None
+
+        with open(self.path(digest), 'rb') as f:
+            return f.read()
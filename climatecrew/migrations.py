@@ -0,0 +1,353 @@
+def _add_column_if_missing(cursor, table, column, definition):
+    """ALTER TABLE ADD COLUMN for databases created before the column existed"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _base_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            email TEXT UNIQUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # User profiles linked to the users table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_profiles (
+            user_id INTEGER PRIMARY KEY,
+            full_name TEXT,
+            username TEXT,
+            email TEXT,
+            contact TEXT,
+            city TEXT,
+            country TEXT,
+            occupation TEXT,
+            profile_image BLOB,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_management (
+            user_id INTEGER PRIMARY KEY,
+            current_task TEXT,
+            points INTEGER DEFAULT 0,
+            num_tasks_completed INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            task_text TEXT NOT NULL,
+            image BLOB,
+            latitude REAL,
+            longitude REAL,
+            location_text TEXT,
+            description TEXT,
+            submission_date TEXT,
+            upvotes INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+
+def _submission_indexes(cursor):
+    # Submissions by date and by user. Both match the (submission_date, id)
+    # keyset order of get_submissions_page, so a page is an index seek
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_submissions_feed
+        ON user_submissions (submission_date DESC, id DESC)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_submissions_user_feed
+        ON user_submissions (user_id, submission_date DESC, id DESC)
+    ''')
+
+
+def _leaderboard(cursor):
+    # Materialized leaderboard, kept in step with task_management whenever a
+    # user's points change. The rank index serves top-N reads and rank
+    # lookups without sorting the whole user base.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            points INTEGER NOT NULL DEFAULT 0,
+            num_tasks_completed INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_leaderboard_rank
+        ON leaderboard (points DESC, user_id)
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO leaderboard (user_id, username, points, num_tasks_completed)
+        SELECT t.user_id, u.username, t.points, t.num_tasks_completed
+        FROM task_management t
+        JOIN users u ON u.id = t.user_id
+    ''')
+
+
+def _media_digests(cursor):
+    # Images moved into the media store keep only their digest in the row
+    _add_column_if_missing(cursor, 'user_profiles', 'profile_image_hash', 'TEXT')
+    _add_column_if_missing(cursor, 'user_submissions', 'image_hash', 'TEXT')
+
+
+def _hot_query_indexes(cursor):
+    # Ranking straight off task_management (leaderboard rebuilds, reports)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_task_management_points
+        ON task_management (points DESC, user_id)
+    ''')
+    # Covering index for the login lookup. It turned out to be redundant
+    # with the UNIQUE index on username; migration 11 drops it again.
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_users_username_login
+        ON users (username, password_hash, email)
+    ''')
+
+
+def _submission_spatial_index(cursor):
+    # R*Tree over submission coordinates, so map queries only visit the rows
+    # inside the visible bounding box. Points are stored as zero-size boxes;
+    # rows without coordinates are left out. Triggers keep it in sync.
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS submissions_rtree
+        USING rtree(id, min_lat, max_lat, min_lon, max_lon)
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS submissions_rtree_insert
+        AFTER INSERT ON user_submissions
+        WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+        BEGIN
+            INSERT OR REPLACE INTO submissions_rtree
+            VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS submissions_rtree_update
+        AFTER UPDATE OF latitude, longitude ON user_submissions
+        BEGIN
+            DELETE FROM submissions_rtree WHERE id = old.id;
+            INSERT INTO submissions_rtree
+            SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+            WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS submissions_rtree_delete
+        AFTER DELETE ON user_submissions
+        BEGIN
+            DELETE FROM submissions_rtree WHERE id = old.id;
+        END
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO submissions_rtree
+        SELECT id, latitude, latitude, longitude, longitude
+        FROM user_submissions
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    ''')
+
+
+def _submission_search(cursor):
+    # FTS5 index over the searchable text of submissions. It is an external
+    # content table, so the text itself is only stored in user_submissions;
+    # the triggers feed every change into the index.
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS submissions_fts USING fts5(
+            task_text, description, location_text,
+            content='user_submissions', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS submissions_fts_insert
+        AFTER INSERT ON user_submissions
+        BEGIN
+            INSERT INTO submissions_fts (rowid, task_text, description, location_text)
+            VALUES (new.id, new.task_text, new.description, new.location_text);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS submissions_fts_update
+        AFTER UPDATE OF task_text, description, location_text ON user_submissions
+        BEGIN
+            INSERT INTO submissions_fts (submissions_fts, rowid, task_text, description, location_text)
+            VALUES ('delete', old.id, old.task_text, old.description, old.location_text);
+            INSERT INTO submissions_fts (rowid, task_text, description, location_text)
+            VALUES (new.id, new.task_text, new.description, new.location_text);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS submissions_fts_delete
+        AFTER DELETE ON user_submissions
+        BEGIN
+            INSERT INTO submissions_fts (submissions_fts, rowid, task_text, description, location_text)
+            VALUES ('delete', old.id, old.task_text, old.description, old.location_text);
+        END
+    ''')
+    cursor.execute("INSERT INTO submissions_fts (submissions_fts) VALUES ('rebuild')")
+
+
+def _user_aggregates(cursor):
+    # Per-user counters kept current by triggers, so screens read one row
+    # instead of running COUNT/SUM over user_submissions. They are lifetime
+    # totals: there is deliberately no delete trigger, so posts moved out of
+    # the table (e.g. archived) still count.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_aggregates (
+            user_id INTEGER PRIMARY KEY,
+            submissions INTEGER NOT NULL DEFAULT 0,
+            upvotes_received INTEGER NOT NULL DEFAULT 0,
+            last_submission_date TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS user_aggregates_insert
+        AFTER INSERT ON user_submissions
+        BEGIN
+            INSERT INTO user_aggregates (user_id, submissions, upvotes_received,
+                                         last_submission_date)
+            VALUES (new.user_id, 1, COALESCE(new.upvotes, 0), new.submission_date)
+            ON CONFLICT (user_id) DO UPDATE SET
+                submissions = submissions + 1,
+                upvotes_received = upvotes_received + excluded.upvotes_received,
+                last_submission_date = CASE
+                    WHEN last_submission_date IS NULL
+                      OR excluded.last_submission_date > last_submission_date
+                    THEN excluded.last_submission_date
+                    ELSE last_submission_date END;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS user_aggregates_upvote
+        AFTER UPDATE OF upvotes ON user_submissions
+        WHEN COALESCE(new.upvotes, 0) != COALESCE(old.upvotes, 0)
+        BEGIN
+            UPDATE user_aggregates
+            SET upvotes_received = upvotes_received
+                + COALESCE(new.upvotes, 0) - COALESCE(old.upvotes, 0)
+            WHERE user_id = new.user_id;
+        END
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO user_aggregates (user_id, submissions, upvotes_received,
+                                                last_submission_date)
+        SELECT user_id, COUNT(*), COALESCE(SUM(upvotes), 0), MAX(submission_date)
+        FROM user_submissions
+        GROUP BY user_id
+    ''')
+
+
+def _points_daily(cursor):
+    # Points and completed tasks per user per day, written alongside the
+    # lifetime totals in task_management. Weekly and monthly rankings sum at
+    # most a month of these buckets instead of replaying any history.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS points_daily (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            points INTEGER NOT NULL DEFAULT 0,
+            tasks INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        ) WITHOUT ROWID
+    ''')
+    # Covers the windowed leaderboard: a range on day, summed per user
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_points_daily_day
+        ON points_daily (day, user_id, points, tasks)
+    ''')
+
+
+def _withdrawn(cursor):
+    # Migration 10 used to overwrite NULL submission dates with the oldest
+    # date on record. It was withdrawn before release: a date nobody entered
+    # ended up on screen and in user_aggregates. NULL dates are kept and
+    # the feed pages through them after every dated row instead. The
+    # version stays taken so databases that already ran it stay in step.
+    pass
+
+
+def _drop_login_index(cursor):
+    # The login lookup is a unique-key probe that already goes through
+    # sqlite_autoindex_users_1 (the UNIQUE constraint on username). The extra
+    # covering index saved one row fetch per login at the cost of a second
+    # copy of every password hash, written on each registration.
+    cursor.execute("DROP INDEX IF EXISTS idx_users_username_login")
+
+
+# Each migration runs once, in order, in its own transaction and is recorded
+# in schema_version. To change the schema append a new entry; never edit one
+# that has shipped. Steps must also work on databases created before this
+# module existed, when create_tables used CREATE TABLE IF NOT EXISTS.
+MIGRATIONS = [
+    (1, "base tables", _base_tables),
+    (2, "submission feed indexes", _submission_indexes),
+    (3, "materialized leaderboard", _leaderboard),
+    (4, "media store digests", _media_digests),
+    (5, "hot query indexes", _hot_query_indexes),
+    (6, "submission spatial index", _submission_spatial_index),
+    (7, "submission full-text search", _submission_search),
+    (8, "per-user aggregate counters", _user_aggregates),
+    (9, "daily points rollup", _points_daily),
+    (10, "backfill missing submission dates (withdrawn)", _withdrawn),
+    (11, "drop unused login index", _drop_login_index),
+]
+
+
+def current_version(conn):
+    """Highest migration version applied to the database, 0 if none"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """Apply every migration newer than the database; returns the versions applied"""
+    applied = []
+    if conn.in_transaction:
+        conn.commit()
+
+    for version, name, migrate in sorted(migrations, key=lambda m: m[0]):
+        if version <= current_version(conn):
+            continue
+
+        # IMMEDIATE takes the write lock up front, so a second process starting
+        # at the same time waits here and then sees the version as applied
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if version <= current_version(conn):
+                conn.rollback()
+                continue
+            cursor = conn.cursor()
+            migrate(cursor)
+            cursor.execute(
+                'INSERT INTO schema_version (version, name) VALUES (?, ?)',
+                (version, name))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        print(f"Applied schema migration {version}: {name}")
+        applied.append(version)
+
+    return applied
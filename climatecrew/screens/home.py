@@ -30,10 +30,11 @@ COLORS = {
 
 
 class HomeScreen(Screen):
-    def __init__(self, db_helper, **kwargs):
+    def __init__(self, db_helper, async_db=None, **kwargs):
         super(HomeScreen, self).__init__(**kwargs)
         self.name = 'home'
         self.db_helper = db_helper
+        self.async_db = async_db  # Runs queries off the main thread
         self.user_id = None
 
         main_layout = FloatLayout()
@@ -108,6 +109,15 @@ class HomeScreen(Screen):
         leaderboard_btn.bind(on_press=self.go_to_leaderboard)
         content.add_widget(leaderboard_btn)
 
+        # Posting activity, read from the per-user aggregate counters
+        self.activity_label = Label(
+            text='',
+            font_size=dp(14),
+            color=get_color_from_hex(COLORS['text'] + 'ff'),
+            size_hint=(1, 0.05)
+        )
+        content.add_widget(self.activity_label)
+
         # self.debug_user_id = Label(
         #     text=f"UserID: {self.user_id}",
         #     size_hint=(None, None),
@@ -359,14 +369,44 @@ class HomeScreen(Screen):
         # Update leaderboard/points display
         if self.user_id and self.db_helper:
             try:
-                points, tasks_completed = self.db_helper.get_user_stats(
-                    self.user_id)
-                self.leaderboard_btn.text = f"Points: {points} | Tasks Completed: {tasks_completed}"
-                print(
-                    f"Updated leaderboard display: Points={points}, Tasks={tasks_completed}")
+                if self.async_db:
+                    # Placeholder until the worker thread returns the stats
+                    self.leaderboard_btn.text = "Points: ... | Tasks Completed: ..."
+                    self.async_db.get_user_stats(
+                        self.user_id, callback=self.show_user_stats,
+                        on_error=self.show_user_stats_error)
+                    self.async_db.get_user_aggregates(
+                        self.user_id, callback=self.show_user_activity,
+                        on_error=self.show_user_activity_error)
+                else:
+                    self.show_user_stats(
+                        self.db_helper.get_user_stats(self.user_id))
+                    self.show_user_activity(
+                        self.db_helper.get_user_aggregates(self.user_id))
             except Exception as e:
                 print(f"Error updating points display: {e}")
 
+    def show_user_stats(self, stats):
+        """Show the user's points and completed tasks"""
+        points, tasks_completed = stats
+        self.leaderboard_btn.text = f"Points: {points} | Tasks Completed: {tasks_completed}"
+        print(
+            f"Updated leaderboard display: Points={points}, Tasks={tasks_completed}")
+
+    def show_user_activity(self, aggregates):
+        """Show how many posts the user made and the upvotes they received"""
+        submissions, upvotes_received, last_submission_date = aggregates
+        self.activity_label.text = f"Posts: {submissions} | Upvotes received: {upvotes_received}"
+
+    def show_user_stats_error(self, error):
+        """Replace the loading placeholder when the stats query fails"""
+        self.leaderboard_btn.text = "Points: unavailable"
+        self.show_task_status(f"Error loading points: {error}")
+
+    def show_user_activity_error(self, error):
+        """Replace the activity line when the aggregates query fails"""
+        self.activity_label.text = "Posts: unavailable"
+
     def load_user_task(self):
         """Load user's current task from database"""
         if not self.user_id or not self.db_helper:
@@ -374,9 +414,21 @@ class HomeScreen(Screen):
             return
 
         try:
-            # Get task data from database
-            task_data = self.db_helper.get_user_task(self.user_id)
+            if self.async_db:
+                # Render a placeholder now; the task arrives from a worker thread
+                self.task.text = "Loading your task..."
+                self.async_db.get_user_task(
+                    self.user_id, callback=self.show_user_task,
+                    on_error=lambda error: self.show_task_status(f"Error: {error}"))
+            else:
+                self.show_user_task(self.db_helper.get_user_task(self.user_id))
+        except Exception as e:
+            print(f"Error loading user task: {e}")
+            self.show_task_status(f"Error: {str(e)}")
 
+    def show_user_task(self, task_data):
+        """Display task data loaded from the database"""
+        try:
             if task_data and task_data[0]:
                 # Update task text
                 self.task.text = task_data[0]
@@ -7,7 +7,7 @@ from kivy.uix.image import Image
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.metrics import dp
-from kivy.utils import get_color_from_hex
+from kivy.utils import get_color_from_hex, escape_markup
 from kivy.graphics import Color, Rectangle, RoundedRectangle
 from kivymd.uix.button import MDFloatingActionButton, MDIconButton
 from kivymd.uix.label import MDLabel
@@ -31,12 +31,17 @@ COLORS = {
 
 
 class LeaderboardScreen(Screen):
-    def __init__(self, db_helper=None, **kwargs):
+    def __init__(self, db_helper=None, async_db=None, **kwargs):
         super(LeaderboardScreen, self).__init__(**kwargs)
         self.name = 'leaderboard'
         self.db_helper = db_helper
+        self.async_db = async_db  # Runs queries off the main thread
         self.user_id = None
         self.leaderboard_data = []
+        self.user_rank = None  # (rank, points, tasks) when outside the top list
+        self.aggregates = {}  # user_id -> (posts, upvotes received, last post date)
+        self.window_days = None  # None for all time, else the last N days
+        self.top_n = 50
 
         # Main layout
         main_layout = FloatLayout()
@@ -107,6 +112,26 @@ class LeaderboardScreen(Screen):
             padding=[dp(10), dp(10)]
         )
 
+        # Period toggle: all-time, monthly or weekly ranking
+        period_bar = BoxLayout(
+            orientation='horizontal',
+            size_hint=(1, None),
+            height=dp(40),
+            spacing=dp(5)
+        )
+        self.period_buttons = {}
+        for text, days in [("All time", None), ("Monthly", 30), ("Weekly", 7)]:
+            period_btn = Button(
+                text=text,
+                color=get_color_from_hex(COLORS['white'] + 'ff'),
+                background_normal=''
+            )
+            period_btn.bind(on_press=lambda instance, days=days: self.set_window(days))
+            self.period_buttons[days] = period_btn
+            period_bar.add_widget(period_btn)
+        self._highlight_period()
+        content_area.add_widget(period_bar)
+
         # Table header
         table_header = GridLayout(
             cols=3,
@@ -258,36 +283,57 @@ class LeaderboardScreen(Screen):
             return
 
         try:
-            # Fetch leaderboard data
-            self.leaderboard_data = self.get_leaderboard_data()
-            print(
-                f"Retrieved {len(self.leaderboard_data)} users for leaderboard")
+            # Fetch leaderboard data on a worker thread; the table fills in
+            # when it arrives
+            days = self.window_days
+
+            def on_loaded(result):
+                if days == self.window_days:  # Ignore a period left meanwhile
+                    self.on_leaderboard_loaded(result)
 
-            # Update table display
-            self.display_leaderboard()
+            if self.async_db:
+                self.async_db.submit(self.get_leaderboard_data, days,
+                                     callback=on_loaded)
+            else:
+                on_loaded(self.get_leaderboard_data(days))
 
         except Exception as e:
             print(f"Error loading leaderboard: {e}")
             self.show_status(f"Error: {str(e)}")
 
-    def get_leaderboard_data(self):
-        """Get leaderboard data from database"""
+    def on_leaderboard_loaded(self, result):
+        """Show leaderboard data fetched by get_leaderboard_data"""
+        self.leaderboard_data, self.user_rank, self.aggregates = result
+        print(
+            f"Retrieved {len(self.leaderboard_data)} users for leaderboard")
+
+        # Update table display
+        self.display_leaderboard()
+
+    def get_leaderboard_data(self, days=None):
+        """Get (top users, current user's rank or None, aggregates) from database
+
+        days limits the ranking to the last N days; None ranks all time.
+        """
         try:
-            # Use a SQL query that joins task_management with users to get usernames
-            query = '''
-                SELECT u.username, t.points, t.num_tasks_completed, u.id
-                FROM task_management t
-                JOIN users u ON t.user_id = u.id
-                ORDER BY t.points DESC
-            '''
-
-            self.db_helper.cursor.execute(query)
-            results = self.db_helper.cursor.fetchall()
-            return results
+            # All time comes straight off the materialized leaderboard, the
+            # periods from the daily points buckets
+            results = self.db_helper.get_leaderboard(self.top_n, days=days)
+
+            # Look up the current user's own rank if they are not listed
+            user_rank = None
+            if self.user_id and all(row[3] != self.user_id for row in results):
+                user_rank = self.db_helper.get_user_rank(self.user_id, days=days)
+
+            # Post and upvote counters for every listed user in one query
+            aggregates = self.db_helper.get_user_aggregates_many(
+                [row[3] for row in results] + [self.user_id])
+
+            return results, user_rank, aggregates
 
         except Exception as e:
             print(f"Error getting leaderboard data: {e}")
-            return []
+            return [], None, {}
 
     def display_leaderboard(self):
         """Display leaderboard data in the table"""
@@ -311,76 +357,107 @@ class LeaderboardScreen(Screen):
         # Add user rows to table
         for rank, user_data in enumerate(self.leaderboard_data, start=1):
             username, points, tasks_completed, user_id = user_data
+            self.table_content.add_widget(
+                self._build_row(rank, username, points, tasks_completed, user_id))
 
-            # Create row
-            row = GridLayout(
-                cols=3,
-                size_hint=(1, None),
-                height=dp(50)
-            )
+        row_count = len(self.leaderboard_data)
 
-            # Add background color - alternate colors for readability
-            with row.canvas.before:
-                if rank % 2 == 0:
-                    Color(rgba=get_color_from_hex('#f5f5f5ff'))
-                else:
-                    Color(rgba=get_color_from_hex('#ffffffff'))
-
-                # Highlight current user's row
-                if user_id == self.user_id:
-                    Color(rgba=get_color_from_hex('#e3f2fd' + 'ff'))
-
-                # Medal colors for top 3
-                if rank == 1:
-                    Color(rgba=get_color_from_hex(COLORS['gold'] + '33'))
-                elif rank == 2:
-                    Color(rgba=get_color_from_hex(COLORS['silver'] + '33'))
-                elif rank == 3:
-                    Color(rgba=get_color_from_hex(COLORS['bronze'] + '33'))
-
-                row_bg = Rectangle(size=row.size, pos=row.pos)
-                row.bind(size=lambda obj, val, bg=row_bg: setattr(bg, 'size', val),
-                         pos=lambda obj, val, bg=row_bg: setattr(bg, 'pos', val))
-
-            # Rank with medal icon for top 3
-            rank_text = str(rank)
-            if rank <= 3:
-                medal_icons = ['', '', '']
-                rank_text = f"{medal_icons[rank-1]} {rank}"
-
-            rank_label = Label(
-                text=rank_text,
-                color=get_color_from_hex(COLORS['text'] + 'ff'),
-                bold=True if rank <= 3 else False,
-                size_hint_x=0.2
-            )
+        # Show the current user's own position below the top list
+        if self.user_rank:
+            rank, points, tasks_completed = self.user_rank
+            self.table_content.add_widget(
+                self._build_row(rank, "You", points, tasks_completed, self.user_id))
+            row_count += 1
 
-            # Username
-            username_label = Label(
-                text=username,
-                color=get_color_from_hex(COLORS['text'] + 'ff'),
-                bold=True if user_id == self.user_id else False,
-                size_hint_x=0.5,
-                halign='left',
-                text_size=(dp(150), None)
-            )
+        # Set total height
+        self.table_content.height = row_count * dp(50)
 
-            # Points with task count
-            points_label = Label(
-                text=f"{points} pts ({tasks_completed} tasks)",
-                color=get_color_from_hex(COLORS['primary'] + 'ff'),
-                bold=True,
-                size_hint_x=0.3
-            )
+    def _build_row(self, rank, username, points, tasks_completed, user_id):
+        """Create one leaderboard table row"""
+        # Create row
+        row = GridLayout(
+            cols=3,
+            size_hint=(1, None),
+            height=dp(50)
+        )
 
-            row.add_widget(rank_label)
-            row.add_widget(username_label)
-            row.add_widget(points_label)
+        # Add background color - alternate colors for readability
+        with row.canvas.before:
+            if rank % 2 == 0:
+                Color(rgba=get_color_from_hex('#f5f5f5ff'))
+            else:
+                Color(rgba=get_color_from_hex('#ffffffff'))
+
+            # Highlight current user's row
+            if user_id == self.user_id:
+                Color(rgba=get_color_from_hex('#e3f2fd' + 'ff'))
+
+            # Medal colors for top 3
+            if rank == 1:
+                Color(rgba=get_color_from_hex(COLORS['gold'] + '33'))
+            elif rank == 2:
+                Color(rgba=get_color_from_hex(COLORS['silver'] + '33'))
+            elif rank == 3:
+                Color(rgba=get_color_from_hex(COLORS['bronze'] + '33'))
+
+            row_bg = Rectangle(size=row.size, pos=row.pos)
+            row.bind(size=lambda obj, val, bg=row_bg: setattr(bg, 'size', val),
+                     pos=lambda obj, val, bg=row_bg: setattr(bg, 'pos', val))
+
+        # Rank with medal icon for top 3
+        rank_text = str(rank)
+        if rank <= 3:
+            medal_icons = ['', '', '']
+            rank_text = f"{medal_icons[rank-1]} {rank}"
+
+        rank_label = Label(
+            text=rank_text,
+            color=get_color_from_hex(COLORS['text'] + 'ff'),
+            bold=True if rank <= 3 else False,
+            size_hint_x=0.2
+        )
 
-            self.table_content.add_widget(row)
+        # Username with the user's posting activity underneath
+        submissions, upvotes_received, _ = self.aggregates.get(
+            user_id, (0, 0, None))
+        username_label = Label(
+            text=f"{escape_markup(username)}\n[size=12sp]{submissions} posts · {upvotes_received} upvotes[/size]",
+            markup=True,
+            color=get_color_from_hex(COLORS['text'] + 'ff'),
+            bold=True if user_id == self.user_id else False,
+            size_hint_x=0.5,
+            halign='left',
+            text_size=(dp(150), None)
+        )
 
-        # Set total height
-        self.table_content.height = len(self.leaderboard_data) * dp(50)
+        # Points with task count
+        points_label = Label(
+            text=f"{points} pts ({tasks_completed} tasks)",
+            color=get_color_from_hex(COLORS['primary'] + 'ff'),
+            bold=True,
+            size_hint_x=0.3
+        )
+
+        row.add_widget(rank_label)
+        row.add_widget(username_label)
+        row.add_widget(points_label)
+
+        return row
+
+    def set_window(self, days):
+        """Switch between the all-time, monthly and weekly ranking"""
+        if days == self.window_days:
+            return
+        self.window_days = days
+        self._highlight_period()
+        self.load_leaderboard()
+
+    def _highlight_period(self):
+        for days, period_btn in self.period_buttons.items():
+            active = days == self.window_days
+            period_btn.background_color = get_color_from_hex(
+                ('#FFD54F' if active else COLORS['primary']) + 'ff')
+            period_btn.bold = active
 
     def refresh_leaderboard(self, *args):
         """Refresh leaderboard data"""
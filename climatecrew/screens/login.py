@@ -24,9 +24,11 @@ COLORS = {
 
 
 class LoginScreen(Screen):
-    def __init__(self, db_helper, **kwargs):
+    def __init__(self, db_helper, async_db=None, **kwargs):
         super(LoginScreen, self).__init__(**kwargs)
         self.db_helper = db_helper
+        self.async_db = async_db  # Password hashing is slow, keep it off the UI thread
+        self.signing_in = False
         self.name = 'login'
         self.user_id = None
 
@@ -131,7 +133,23 @@ class LoginScreen(Screen):
             self.message.color = (1, 0, 0, 1)
             return
 
-        user_data = self.db_helper.authenticate_user(username, password)
+        if self.signing_in:
+            return  # Already checking; ignore repeated taps
+
+        if self.async_db:
+            self.signing_in = True
+            self.message.text = "Signing in..."
+            self.message.color = get_color_from_hex(COLORS['text'] + 'ff')
+            self.async_db.authenticate_user(
+                username, password, callback=self.on_authenticated,
+                on_error=self.on_authentication_error)
+        else:
+            self.on_authenticated(
+                self.db_helper.authenticate_user(username, password))
+
+    def on_authenticated(self, user_data):
+        """Handle the result of authenticate_user on the main thread"""
+        self.signing_in = False
 
         if user_data:  # If authentication is successful
             user_id = user_data[0]  # Assuming first element is user_id
@@ -152,6 +170,11 @@ class LoginScreen(Screen):
             self.message.text = 'Invalid username or password.'
             self.message.color = (1, 0, 0, 1)
 
+    def on_authentication_error(self, error):
+        self.signing_in = False
+        self.message.text = 'Could not sign in. Please try again.'
+        self.message.color = (1, 0, 0, 1)
+
     # Example code to navigate from login to profile (add this to your login screen)
     def on_login_success(self, user_id):
         # Set user ID in profile screen
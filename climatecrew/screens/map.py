@@ -15,7 +15,6 @@ from kivy.clock import Clock
 from kivy.app import App
 from kivy_garden.mapview import MapView, MapMarker, MapMarkerPopup
 from kivy.uix.popup import Popup
-import tempfile
 import os
 from datetime import datetime
 
@@ -76,7 +75,7 @@ class PostPreviewPopup(Popup):
         self.background_color = get_color_from_hex(COLORS['white'] + 'dd')
 
         # Unpack post data
-        post_id, user_id, task_text, image_data, lat, lon, location_text, description, date, upvotes = post_data
+        post_id, user_id, task_text, has_image, lat, lon, location_text, description, date, upvotes = post_data
 
         # Create layout for popup content
         content = BoxLayout(orientation='vertical',
@@ -129,12 +128,14 @@ class PostPreviewPopup(Popup):
 
 
 class MapScreen(Screen):
-    def __init__(self, db_helper=None, **kwargs):
+    def __init__(self, db_helper=None, async_db=None, **kwargs):
         super(MapScreen, self).__init__(**kwargs)
         self.name = 'map'
         self.db_helper = db_helper
+        self.async_db = async_db  # Runs queries off the main thread
         self.user_id = None
         self.posts = []
+        self.authors = {}  # user_id -> (username, avatar path) for the markers
         self.current_post = None
         self.showing_map = True  # Track if map or post detail is showing
 
@@ -216,6 +217,12 @@ class MapScreen(Screen):
         )
         self.map_view.map_source.allow_zoom = True
 
+        # Panning and zooming fire many relocations; query once they settle
+        self.marker_request = 0  # Lets results for an older view be dropped
+        self.reload_markers_trigger = Clock.create_trigger(
+            self.load_map_markers, 0.4)
+        self.map_view.bind(on_map_relocated=self.on_map_relocated)
+
         self.content_area.add_widget(self.map_view)
 
         # Post detail container (hidden initially)
@@ -340,46 +347,60 @@ class MapScreen(Screen):
     # Update the load_map_markers method
 
     def load_map_markers(self, *args):
-        """Load all posts with location data and create markers"""
+        """Load the posts inside the visible part of the map and create markers"""
         if not self.db_helper:
             return
 
+        try:
+            bbox = tuple(self.map_view.get_bbox())
+            self.marker_request += 1
+            request = self.marker_request
+
+            def on_markers(result):
+                if request == self.marker_request:  # Drop results for an old view
+                    self.add_markers(result)
+
+            # Markers only need coordinates and text, so skip the image BLOBs.
+            # The map stays interactive while the worker thread runs the query.
+            if self.async_db:
+                self.async_db.submit(self.fetch_markers, bbox, callback=on_markers)
+            else:
+                on_markers(self.fetch_markers(bbox))
+        except Exception as e:
+            print(f"Error loading map markers: {e}")
+
+    def on_map_relocated(self, *args):
+        """Reload markers once the user stops panning or zooming"""
+        self.reload_markers_trigger()
+
+    def fetch_markers(self, bbox, limit=200):
+        """Query the posts to pin and resolve all their authors in one go"""
+        min_lat, min_lon, max_lat, max_lon = bbox
+        rows = self.db_helper.get_submissions_in_bbox(
+            min_lat, min_lon, max_lat, max_lon, limit=limit)
+        authors = self.db_helper.get_user_summaries(post[1] for post in rows)
+        return rows, authors
+
+    def add_markers(self, result):
+        """Replace the map markers with the loaded posts"""
         try:
             # Clear existing markers
             self.map_view.clear_markers()
 
-            # Get all submissions from database
-            self.posts = self.db_helper.get_user_submissions(limit=100)
+            self.posts, self.authors = result
             print(f"Retrieved {len(self.posts)} posts for map")
 
-            # Create marker for each post with valid coordinates
+            # Every row comes from the spatial index, so all have coordinates
             markers_added = 0
-            min_lat, max_lat = 90, -90
-            min_lon, max_lon = 180, -180
-
             for post in self.posts:
-                post_id, user_id, task_text, image_data, lat, lon, location_text, description, date, upvotes = post
-
-                # Skip posts without coordinates
-                if lat is None or lon is None:
-                    continue
+                post_id, user_id, task_text, has_image, lat, lon, location_text, description, date, upvotes = post
 
                 try:
-                    # Convert to float
-                    lat_float = float(lat)
-                    lon_float = float(lon)
-
-                    # Track bounds for map centering
-                    min_lat = min(min_lat, lat_float)
-                    max_lat = max(max_lat, lat_float)
-                    min_lon = min(min_lon, lon_float)
-                    max_lon = max(max_lon, lon_float)
-
                     # Create marker - skip the preview popup and go directly to post view
                     marker = CustomMarker(
                         post_data=post,
-                        lat=lat_float,
-                        lon=lon_float,
+                        lat=float(lat),
+                        lon=float(lon),
                         on_select_callback=self.show_post_detail  # Direct to full post view
                     )
 
@@ -391,27 +412,6 @@ class MapScreen(Screen):
 
             print(f"Added {markers_added} markers to map")
 
-            # Center map if markers were added
-            if markers_added > 0:
-                # Calculate center of all markers
-                center_lat = (min_lat + max_lat) / 2
-                center_lon = (min_lon + max_lon) / 2
-
-                # Determine appropriate zoom level based on bounds
-                lat_span = max_lat - min_lat
-                lon_span = max_lon - min_lon
-
-                # Center map and adjust zoom
-                self.map_view.center_on(center_lat, center_lon)
-
-                # Adjust zoom based on the geographic spread
-                if lat_span > 0 or lon_span > 0:
-                    # This will zoom out more for widely dispersed markers
-                    max_span = max(lat_span, lon_span)
-                    # Adjust algorithm as needed
-                    zoom = min(15, max(9, int(10 - max_span * 10)))
-                    self.map_view.zoom = zoom
-
         except Exception as e:
             print(f"Error loading map markers: {e}")
 
@@ -434,11 +434,15 @@ class MapScreen(Screen):
         self.post_content.clear_widgets()
 
         # Unpack post data
-        post_id, user_id, task_text, image_data, lat, lon, location_text, description, submission_date, upvotes = post_data
+        post_id, user_id, task_text, has_image, lat, lon, location_text, description, submission_date, upvotes = post_data
+
+        # Look up the image only now that the post is actually opened
+        image_path = self.db_helper.get_submission_image_path(
+            post_id) if has_image else None
 
-        # Get username from database
-        user_profile = self.db_helper.get_user_profile(user_id)
-        username = user_profile[2] if user_profile else f"User {user_id}"
+        # Authors were resolved together with the markers
+        author = self.authors.get(user_id)
+        username = author[0] if author else f"User {user_id}"
 
         # Header with username and date
         header = BoxLayout(
@@ -460,8 +464,11 @@ class MapScreen(Screen):
         )
 
         # Date label
-        date_obj = datetime.strptime(submission_date, "%Y-%m-%d")
-        formatted_date = date_obj.strftime("%b %d, %Y")
+        if submission_date:
+            date_obj = datetime.strptime(submission_date, "%Y-%m-%d")
+            formatted_date = date_obj.strftime("%b %d, %Y")
+        else:
+            formatted_date = "No date"
         date_label = MDLabel(
             text=formatted_date,
             theme_text_color="Custom",
@@ -524,7 +531,7 @@ class MapScreen(Screen):
         self.post_content.add_widget(task_text_label)
 
         # Post image
-        if image_data:
+        if image_path:
             image_box = BoxLayout(
                 orientation='vertical',
                 size_hint=(1, None),
@@ -532,15 +539,9 @@ class MapScreen(Screen):
                 padding=[0, dp(10)]
             )
 
-            # Save image to temp file
-            temp_image = tempfile.NamedTemporaryFile(
-                delete=False, suffix='.png')
-            temp_image.write(image_data)
-            temp_image.close()
-
-            # Display image
+            # Display image straight from the media store file
             post_image = Image(
-                source=temp_image.name,
+                source=image_path,
                 size_hint=(1, 1)
             )
             image_box.add_widget(post_image)
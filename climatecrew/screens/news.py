@@ -9,13 +9,14 @@ from kivy.uix.button import Button
 from kivy.metrics import dp
 from kivy.utils import get_color_from_hex
 from kivy.graphics import Color, Rectangle, RoundedRectangle
-from kivy.network.urlrequest import UrlRequest
 from kivy.properties import ListProperty, NumericProperty
 from kivy.clock import Clock
 from kivymd.uix.button import MDFloatingActionButton, MDIconButton
 from kivymd.uix.label import MDLabel
 from kivymd.uix.card import MDCard
 import json
+import threading
+import urllib.request
 import webbrowser
 
 
@@ -39,6 +40,10 @@ class NewsScreen(Screen):
     def __init__(self, **kwargs):
         super(NewsScreen, self).__init__(**kwargs)
         self.name = 'news'
+        # Articles the server said are coming, for the "x of n" counter
+        self.expected_count = 0
+        # Bumped on every fetch so a stream from an earlier visit is ignored
+        self.stream_id = 0
 
         main_layout = FloatLayout()
         with main_layout.canvas.before:
@@ -241,30 +246,58 @@ class NewsScreen(Screen):
         self.fetch_news()
 
     def fetch_news(self):
-        """Fetch climate news from API"""
-        url = "http://localhost:5000/api/climate-news?count=15"
-        UrlRequest(
-            url,
-            on_success=self.on_news_success,
-            on_error=self.on_news_error,
-            on_failure=self.on_news_error,
-            req_headers={'Content-Type': 'application/json'}
-        )
-
-    def on_news_success(self, request, result):
-        """Handle successful news API response"""
-        self.news_items = result.get('articles', [])
-        if self.news_items:
+        """Stream climate news from the API, one article at a time"""
+        self.stream_id += 1
+        url = "http://localhost:5000/api/climate-news/stream?count=15"
+        threading.Thread(target=self.read_news_stream,
+                         args=(url, self.stream_id), daemon=True).start()
+
+    def read_news_stream(self, url, stream_id):
+        """Runs on a worker thread; hands each line to the UI via Clock"""
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                for line in response:
+                    if line.strip():
+                        event = json.loads(line)
+                        Clock.schedule_once(
+                            lambda dt, event=event: self.on_news_event(stream_id, event))
+        except Exception as e:
+            Clock.schedule_once(
+                lambda dt, error=e: self.on_news_error(stream_id, error))
+
+    def on_news_event(self, stream_id, event):
+        """Handle one line of the news stream"""
+        if stream_id != self.stream_id:
+            return
+        if 'error' in event:
+            self.on_news_error(stream_id, event['error'])
+        elif 'count' in event:
+            self.news_items = []
             self.current_index = 0
-            self.display_current_news()
-        else:
-            self.display_error("No news articles available.")
-
-    def on_news_error(self, request, error):
+            self.expected_count = event['count']
+            if not self.expected_count:
+                self.display_error("No news articles available.")
+        elif 'summary' in event:
+            # Show the first article as soon as it arrives; later ones only
+            # update the counter until the user moves on
+            self.news_items.append(event)
+            if len(self.news_items) == 1:
+                self.display_current_news()
+            else:
+                self.counter_label.text = self.counter_text()
+
+    def on_news_error(self, stream_id, error):
         """Handle news API error"""
+        if stream_id != self.stream_id:
+            return
         print(f"News API Error: {error}")
-        print(f"Request: {request}")
-        self.display_error(f"Could not load news: {error}")
+        # Keep whatever arrived before the stream broke
+        if not self.news_items:
+            self.display_error(f"Could not load news: {error}")
+
+    def counter_text(self):
+        total = max(self.expected_count, len(self.news_items))
+        return f"Article {self.current_index + 1} of {total}"
 
     def display_error(self, message):
         """Display error message in the news card"""
@@ -356,14 +389,14 @@ class NewsScreen(Screen):
         # content_layout.add_widget(source_layout)
 
         # News counter
-        counter_label = MDLabel(
-            text=f"Article {self.current_index + 1} of {len(self.news_items)}",
+        self.counter_label = MDLabel(
+            text=self.counter_text(),
             theme_text_color="Hint",
             halign="center",
             size_hint_y=None,
             height=dp(30)
         )
-        content_layout.add_widget(counter_label)
+        content_layout.add_widget(self.counter_label)
 
         self.news_card.add_widget(content_layout)
 
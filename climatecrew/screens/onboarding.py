@@ -11,7 +11,6 @@ from kivy.metrics import dp
 from kivy.utils import get_color_from_hex
 from kivy.core.window import Window
 from kivy.graphics import Color, Rectangle
-import sqlite3
 
 # Color scheme based on your Figma design
 COLORS = {
@@ -24,11 +23,11 @@ COLORS = {
 
 
 class OnboardingScreen(Screen):
-    def __init__(self, **kwargs):
+    def __init__(self, db_helper=None, **kwargs):
         super(OnboardingScreen, self).__init__(**kwargs)
         self.name = 'onboarding'
         self.user_id = None
-        self.db_path = "user_auth.db"  # Update with your actual DB path
+        self.db_helper = db_helper
 
         layout = FloatLayout()
         with layout.canvas.before:
@@ -188,76 +187,23 @@ class OnboardingScreen(Screen):
             print("Error: No user_id found!")  # Prevent saving without user_id
             return False
 
-        try:
-            # Connect to database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # First, get username and email from users table
-            cursor.execute(
-                'SELECT username, email FROM users WHERE id = ?', (self.user_id,))
-            user_data = cursor.fetchone()
-
-            if not user_data:
-                self.status_label.text = "Error: User not found in database!"
-                print(
-                    f"Error: User with ID {self.user_id} not found in database!")
-                conn.close()
-                return False
-
-            username, email = user_data
-
-            # Check if user already has a profile
-            cursor.execute(
-                'SELECT user_id FROM user_profiles WHERE user_id = ?', (self.user_id,))
-            existing_profile = cursor.fetchone()
-
-            if existing_profile:
-                # Update existing profile
-                cursor.execute('''
-                    UPDATE user_profiles 
-                    SET full_name = ?, username = ?, email = ?, contact = ?, 
-                        city = ?, country = ?, occupation = ?
-                    WHERE user_id = ?
-                ''', (
-                    self.full_name_input.text.strip(),
-                    username,
-                    email,
-                    self.contact_input.text.strip(),
-                    self.city_input.text.strip(),
-                    self.country_input.text.strip(),
-                    self.occupation_input.text.strip(),
-                    self.user_id
-                ))
-            else:
-                # Insert new profile
-                cursor.execute('''
-                    INSERT INTO user_profiles 
-                    (user_id, full_name, username, email, contact, city, country, occupation)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    self.user_id,
-                    self.full_name_input.text.strip(),
-                    username,
-                    email,
-                    self.contact_input.text.strip(),
-                    self.city_input.text.strip(),
-                    self.country_input.text.strip(),
-                    self.occupation_input.text.strip()
-                ))
-
-            conn.commit()
-            conn.close()
+        if not self.db_helper:
+            self.status_label.text = "Error: Database not available"
+            return False
 
-            print(f"User Profile Saved for ID: {self.user_id}")
-            return True
+        # Saving through DatabaseHelper keeps its profile cache up to date
+        saved = self.db_helper.save_onboarding_profile(
+            self.user_id,
+            full_name=self.full_name_input.text.strip(),
+            contact=self.contact_input.text.strip(),
+            city=self.city_input.text.strip(),
+            country=self.country_input.text.strip(),
+            occupation=self.occupation_input.text.strip()
+        )
 
-        except Exception as e:
-            self.status_label.text = f"Error saving profile: {str(e)}"
-            print(f"Error saving user profile: {e}")
-            if 'conn' in locals() and conn:
-                conn.close()
-            return False
+        if not saved:
+            self.status_label.text = "Error saving profile. Please try again."
+        return saved
 
     def _update_rect(self, instance, value):
         self.rect.pos = instance.pos
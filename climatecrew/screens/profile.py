@@ -176,6 +176,17 @@ class ProfileScreen(Screen):
         image_layout.add_widget(image_buttons)
         content_layout.add_widget(image_layout)
 
+        # Posting activity, read from the per-user aggregate counters
+        self.activity_label = MDLabel(
+            text="",
+            halign="center",
+            theme_text_color="Custom",
+            text_color=get_color_from_hex(COLORS['text'] + 'ff'),
+            size_hint=(1, None),
+            height=dp(30)
+        )
+        content_layout.add_widget(self.activity_label)
+
         # Read-only section header
         readonly_header = MDLabel(
             text="ACCOUNT INFORMATION (READ ONLY)",
@@ -516,15 +527,6 @@ class ProfileScreen(Screen):
 
         self.add_widget(main_layout)
 
-        # Initialize database if available
-        # In ProfileScreen's __init__ method
-        if self.db_helper:
-            try:
-                # Call the create_tables method to ensure all tables are created
-                self.db_helper.create_tables()
-            except Exception as e:
-                print(f"Error creating tables: {e}")
-
     def set_user_id(self, user_id):
         """Set the user ID and load profile data"""
         self.user_id = user_id
@@ -564,24 +566,19 @@ class ProfileScreen(Screen):
             self.country_field.text = country or ""
             self.occupation_field.text = occupation or ""
 
-            # Set profile image if available
-            if profile_image:
-                # Convert BLOB to image file in memory
-                self.profile_image_data = profile_image
-                self._display_profile_image()
-
-    def _display_profile_image(self):
-        """Display the profile image from binary data"""
-        if self.profile_image_data:
-            try:
-                # Save to temp file and display
-                temp_path = 'temp_profile_image.png'
-                with open(temp_path, 'wb') as f:
-                    f.write(self.profile_image_data)
-                self.profile_image.source = temp_path
+            # Set profile image if available; the stored file is shown as is and
+            # profile_image_data stays empty until the user picks a new photo
+            image_path = self.db_helper.get_profile_image_path(self.user_id)
+            if image_path:
+                self.profile_image.source = image_path
                 self.profile_image.reload()
-            except Exception as e:
-                print(f"Error displaying profile image: {e}")
+
+        submissions, upvotes_received, last_submission_date = \
+            self.db_helper.get_user_aggregates(self.user_id)
+        activity = f"{submissions} posts · {upvotes_received} upvotes received"
+        if last_submission_date:
+            activity += f" · last post {last_submission_date}"
+        self.activity_label.text = activity
 
     def save_profile(self, instance):
         """Save profile changes to database"""
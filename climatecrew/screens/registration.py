@@ -24,10 +24,13 @@ COLORS = {
 
 
 class RegistrationScreen(Screen):
-    def __init__(self, db_helper, **kwargs):
+    def __init__(self, db_helper, async_db=None, **kwargs):
         super(RegistrationScreen, self).__init__(**kwargs)
         self.name = 'register'
         self.db_helper = db_helper
+        self.async_db = async_db  # Password hashing is slow, keep it off the UI thread
+        self.signing_up = False
+        self.registered_user_id = None
 
         layout = FloatLayout()
         with layout.canvas.before:
@@ -159,38 +162,52 @@ class RegistrationScreen(Screen):
             self.message.text = 'Password and Confirm Password should be the same'
             return
 
-        response = self.db_helper.register_user(username, password, email)
-        print("Response :", response)
-        if response == True:
-            user_data = self.db_helper.authenticate_user(username, password)
-            if user_data:
-                user_id = user_data[0]
-                # Store user_id in app
-                App.get_running_app().set_user_id(user_id)
-                # Initialize user task
-                self.db_helper.initialize_user_task(user_id)
-                self.message.text = 'Registration Successful!'
-                self.message.color = (0, 1, 0, 1)
-                Clock.schedule_once(self.navigate_to_onboarding, 3)
+        if self.signing_up:
+            return  # Already registering; ignore repeated taps
+
+        # Hashing the password takes a noticeable moment, so create the
+        # account on a worker thread and come back with the new user id
+        if self.async_db:
+            self.signing_up = True
+            self.message.text = 'Creating your account...'
+            self.message.color = get_color_from_hex(COLORS['text'] + 'ff')
+            self.async_db.submit(
+                self.create_account, username, password, email,
+                callback=self.on_registered, on_error=self.on_registration_error)
+        else:
+            self.on_registered(self.create_account(username, password, email))
+
+    def create_account(self, username, password, email):
+        """Register the user and set up their first task; returns the id or False"""
+        user_id = self.db_helper.register_user(username, password, email)
+        print("Response :", user_id)
+        if user_id:
+            # Initialize user task
+            self.db_helper.initialize_user_task(user_id)
+        return user_id
+
+    def on_registered(self, user_id):
+        """Handle the result of create_account on the main thread"""
+        self.signing_up = False
+        if user_id:
+            self.registered_user_id = user_id
+            # Store user_id in app
+            App.get_running_app().set_user_id(user_id)
+            self.message.text = 'Registration Successful!'
+            self.message.color = (0, 1, 0, 1)
+            Clock.schedule_once(self.navigate_to_onboarding, 3)
         else:
             self.message.text = 'Username or email already exists'
             self.message.color = (1, 0, 0, 1)
 
-    def navigate_to_onboarding(self, dt):
-        # Ensure db_helper has a cursor to query the database
-        conn = self.db_helper.connect()  # Now connect() returns a valid connection
-        if conn is None:
-            print("Database connection failed!")
-            return  # Prevent further execution
-
-        cursor = conn.cursor()  # Now this won't cause an error
+    def on_registration_error(self, error):
+        self.signing_up = False
+        self.message.text = 'Could not create your account. Please try again.'
+        self.message.color = (1, 0, 0, 1)
 
-        cursor.execute('SELECT id FROM users WHERE username = ?',
-                       (self.username_input.text.strip(),))
-        user_data = cursor.fetchone()
-
-        if user_data:
-            user_id = user_data[0]
+    def navigate_to_onboarding(self, dt):
+        user_id = self.registered_user_id
+        if user_id:
             print(f"User Registered with ID: {user_id}")  # Debugging
             # App.get_running_app().set_user_id(user_id)
             self.manager.get_screen('onboarding').set_user_id(user_id)
@@ -199,9 +216,6 @@ class RegistrationScreen(Screen):
         else:
             print("Error: User not found in the database after registration.")
 
-        cursor.close()
-        conn.close()
-
     def goto_login(self, instance):
         self.manager.transition = SlideTransition(direction='right')
         self.manager.current = 'login'
@@ -6,6 +6,7 @@ from kivy.uix.scrollview import ScrollView
 from kivy.uix.image import Image, AsyncImage
 from kivy.uix.label import Label
 from kivy.uix.button import Button
+from kivy.uix.textinput import TextInput
 from kivy.metrics import dp
 from kivy.utils import get_color_from_hex
 from kivy.graphics import Color, Rectangle, RoundedRectangle, Ellipse
@@ -17,7 +18,6 @@ from kivy.clock import Clock
 from kivy.app import App
 from kivy.core.window import Window
 import io
-import tempfile
 import os
 from datetime import datetime
 
@@ -66,7 +66,7 @@ class CircularImage(ButtonBehavior, BoxLayout):
 class UpvoteButton(ButtonBehavior, BoxLayout):
     """Custom upvote button with count display"""
 
-    def __init__(self, count=0, callback=None, submission_id=None, **kwargs):
+    def __init__(self, count=0, callback=None, submission_id=None, read_only=False, **kwargs):
         super(UpvoteButton, self).__init__(**kwargs)
         self.orientation = 'horizontal'
         self.size_hint = (None, None)
@@ -100,6 +100,8 @@ class UpvoteButton(ButtonBehavior, BoxLayout):
         self.add_widget(self.count_label)
 
         self.icon_btn.bind(on_press=self.on_upvote)
+        # Archived posts can no longer be upvoted
+        self.icon_btn.disabled = read_only
 
     def on_upvote(self, instance):
         """Handle upvote button press"""
@@ -120,7 +122,8 @@ class UpvoteButton(ButtonBehavior, BoxLayout):
 class PostCard(BoxLayout):
     """A card displaying a user's post"""
 
-    def __init__(self, post_data, db_helper, on_upvote_callback, **kwargs):
+    def __init__(self, post_data, db_helper, on_upvote_callback, author=None,
+                 read_only=False, **kwargs):
         super(PostCard, self).__init__(**kwargs)
         self.orientation = 'vertical'
         self.size_hint = (1, None)
@@ -131,11 +134,12 @@ class PostCard(BoxLayout):
         self.db_helper = db_helper
 
         # Unpack post data
-        post_id, user_id, task_text, image_data, latitude, longitude, location_text, description, submission_date, upvotes = post_data
+        post_id, user_id, task_text, has_image, latitude, longitude, location_text, description, submission_date, upvotes = post_data
 
-        # Get username from database
-        user_profile = db_helper.get_user_profile(user_id)
-        username = user_profile[2] if user_profile else f"User {user_id}"
+        # Author is normally resolved for the whole page by get_user_summaries
+        if author is None:
+            author = db_helper.get_user_summaries([user_id]).get(user_id)
+        username, profile_image_path = author or (f"User {user_id}", None)
 
         # Card background with larger border radius
         with self.canvas.before:
@@ -156,22 +160,12 @@ class PostCard(BoxLayout):
             padding=[0, dp(5)]  # Add some vertical padding
         )
 
-        # Load profile image from database if available
-        profile_image_data = None
-        if user_profile and len(user_profile) > 8:
-            profile_image_data = user_profile[8]
-
         # Create profile image
         self.profile_pic = CircularImage(size=(dp(40), dp(40)))
 
-        # Set default or actual profile image
-        if profile_image_data:
-            # Save to temp file
-            temp_profile = tempfile.NamedTemporaryFile(
-                delete=False, suffix='.png')
-            temp_profile.write(profile_image_data)
-            temp_profile.close()
-            self.profile_pic.set_source(temp_profile.name)
+        # Profile images are files in the media store, so load them directly
+        if profile_image_path:
+            self.profile_pic.set_source(profile_image_path)
 
         # Username label
         username_label = MDLabel(
@@ -185,8 +179,11 @@ class PostCard(BoxLayout):
         )
 
         # Date label
-        date_obj = datetime.strptime(submission_date, "%Y-%m-%d")
-        formatted_date = date_obj.strftime("%b %d, %Y")
+        if submission_date:
+            date_obj = datetime.strptime(submission_date, "%Y-%m-%d")
+            formatted_date = date_obj.strftime("%b %d, %Y")
+        else:
+            formatted_date = "No date"
         date_label = MDLabel(
             text=formatted_date,
             theme_text_color="Custom",
@@ -260,13 +257,13 @@ class PostCard(BoxLayout):
             keep_ratio=True
         )
 
-        # Save image data to temp file and load
-        if image_data:
-            temp_image = tempfile.NamedTemporaryFile(
-                delete=False, suffix='.png')
-            temp_image.write(image_data)
-            temp_image.close()
-            self.post_image.source = temp_image.name
+        # Only the card being shown looks up its image, which Kivy then
+        # reads straight from the media store file
+        image_path = db_helper.get_submission_image_path(
+            post_id) if has_image else None
+
+        if image_path:
+            self.post_image.source = image_path
 
         image_container.add_widget(self.post_image)
         self.add_widget(image_container)
@@ -283,7 +280,8 @@ class PostCard(BoxLayout):
         self.upvote_btn = UpvoteButton(
             count=upvotes,
             callback=on_upvote_callback,
-            submission_id=post_id
+            submission_id=post_id,
+            read_only=read_only
         )
 
         upvote_container.add_widget(self.upvote_btn)
@@ -372,14 +370,21 @@ class PostCard(BoxLayout):
 
 
 class SocialScreen(Screen):
-    def __init__(self, db_helper=None, **kwargs):
+    def __init__(self, db_helper=None, async_db=None, **kwargs):
         super(SocialScreen, self).__init__(**kwargs)
         self.name = 'social'
         self.db_helper = db_helper
+        self.async_db = async_db  # Runs queries off the main thread
         self.user_id = None
         self.current_index = 0
         self.posts = []
+        self.authors = {}  # user_id -> (username, avatar path) for loaded posts
+        self.archived_ids = set()  # Loaded posts that live in the archives
+        self.next_cursor = None  # Keyset cursor for the next page of posts
+        self.page_size = 10
+        self.page_request = 0  # Lets late results from an older load be dropped
         self.showing_user_posts_only = False
+        self.search_query = ""  # Non-empty while showing search results
 
         main_layout = FloatLayout()
         with main_layout.canvas.before:
@@ -447,13 +452,23 @@ class SocialScreen(Screen):
             pos_hint={'top': 0.92}
         )
 
+        # Keyword search, runs when the user presses enter
+        self.search_input = TextInput(
+            hint_text="Search posts",
+            multiline=False,
+            size_hint=(0.5, 0.06),
+            pos_hint={'x': 0.04, 'top': 1}
+        )
+        self.search_input.bind(on_text_validate=self.search_posts)
+        content_area.add_widget(self.search_input)
+
         # Filter toggle button
         self.filter_btn = Button(
             text="Show My Posts Only",
             background_color=get_color_from_hex('#FFD54F' + 'ff'),
             color=get_color_from_hex(COLORS['text'] + 'ff'),
-            size_hint=(0.8, 0.06),
-            pos_hint={'center_x': 0.5, 'top': 1}
+            size_hint=(0.4, 0.06),
+            pos_hint={'right': 0.96, 'top': 1}
         )
         self.filter_btn.bind(on_press=self.toggle_filter)
         content_area.add_widget(self.filter_btn)
@@ -615,18 +630,33 @@ class SocialScreen(Screen):
         try:
             # Clear current posts
             self.posts = []
-
-            # Get submissions based on filter setting
-            if self.showing_user_posts_only and self.user_id:
-                self.posts = self.db_helper.get_user_submissions(self.user_id)
-            else:
-                self.posts = self.db_helper.get_user_submissions()
+            self.authors = {}
+            self.archived_ids = set()
+            self.next_cursor = None
+            self.current_index = 0
 
             # Update filter button text
             self.filter_btn.text = "Show All Posts" if self.showing_user_posts_only else "Show My Posts Only"
 
+            # Show an empty feed right away while the first page loads
+            self.post_container.clear_widgets()
+            self.prev_btn.disabled = True
+            self.next_btn.disabled = True
+            self.show_status("Loading posts...")
+
+            # Get the first page of submissions based on filter setting
+            self.load_next_page(callback=self.on_first_page_loaded)
+
+        except Exception as e:
+            print(f"Error loading posts: {e}")
+            self.show_status(f"Error: {str(e)}")
+
+    def on_first_page_loaded(self, count):
+        """Show the first post once the first page has arrived"""
+        try:
             if not self.posts:
-                self.show_status("No posts available")
+                self.show_status(
+                    "No posts match your search" if self.search_query else "No posts available")
                 self.prev_btn.disabled = True
                 self.next_btn.disabled = True
                 self.post_container.clear_widgets()
@@ -658,7 +688,9 @@ class SocialScreen(Screen):
         post_card = PostCard(
             post_data=self.posts[self.current_index],
             db_helper=self.db_helper,
-            on_upvote_callback=self.handle_upvote
+            on_upvote_callback=self.handle_upvote,
+            author=self.authors.get(self.posts[self.current_index][1]),
+            read_only=self.posts[self.current_index][0] in self.archived_ids
         )
 
         # Add to container
@@ -679,7 +711,9 @@ class SocialScreen(Screen):
             post_card = PostCard(
                 post_data=self.posts[self.current_index],
                 db_helper=self.db_helper,
-                on_upvote_callback=self.handle_upvote
+                on_upvote_callback=self.handle_upvote,
+                author=self.authors.get(self.posts[self.current_index][1]),
+                read_only=self.posts[self.current_index][0] in self.archived_ids
             )
 
             # Add to container
@@ -693,8 +727,60 @@ class SocialScreen(Screen):
             print(f"Error displaying post: {e}")
             self.show_status("Error displaying post")
 
+    def load_next_page(self, callback=None):
+        """Fetch the next page of posts and append it to the loaded posts
+
+        callback(count) runs on the main thread once the page is in.
+        """
+        user_id = self.user_id if self.showing_user_posts_only else None
+        self.page_request += 1
+        request = self.page_request
+
+        def on_page(result):
+            if request != self.page_request:
+                return  # A newer load replaced this one
+            rows, self.next_cursor, authors, archived_ids = result
+            self.posts.extend(rows)
+            self.authors.update(authors)
+            self.archived_ids.update(archived_ids)
+            if callback:
+                callback(len(rows))
+
+        if self.async_db:
+            self.async_db.submit(self.fetch_page, user_id, self.next_cursor,
+                                 callback=on_page)
+        else:
+            on_page(self.fetch_page(user_id, self.next_cursor))
+
+    def fetch_page(self, user_id, cursor):
+        """Query one page of posts, the authors of all of them and which
+        of them are archived
+
+        Three queries per page no matter how many posts it holds. While a
+        search is active the page comes from the full-text index and the
+        cursor is the offset into the ranked results.
+        """
+        if self.search_query:
+            rows, next_cursor = self.db_helper.search_submissions(
+                self.search_query, user_id=user_id, offset=cursor or 0,
+                limit=self.page_size)
+        else:
+            rows, next_cursor = self.db_helper.get_submissions_metadata(
+                user_id=user_id, cursor=cursor, limit=self.page_size)
+        authors = self.db_helper.get_user_summaries(
+            post[1] for post in rows if post[1] not in self.authors)
+        archived_ids = self.db_helper.get_archived_ids(post[0] for post in rows)
+        return rows, next_cursor, authors, archived_ids
+
     def show_next_post(self, instance):
         """Show the next post"""
+        # Fetch the following page when we reach the end of the loaded ones
+        if self.current_index >= len(self.posts) - 1 and self.next_cursor:
+            self.next_btn.disabled = True
+            self.load_next_page(
+                callback=lambda count: self.show_next_post(instance))
+            return
+
         if self.current_index < len(self.posts) - 1:
             self.current_index += 1
             self.display_current_post()
@@ -710,22 +796,34 @@ class SocialScreen(Screen):
     def update_nav_buttons(self):
         """Update navigation button states"""
         self.prev_btn.disabled = self.current_index == 0
-        self.next_btn.disabled = self.current_index >= len(self.posts) - 1
+        self.next_btn.disabled = (self.current_index >= len(self.posts) - 1
+                                  and not self.next_cursor)
 
     def toggle_filter(self, instance):
         """Toggle between showing all posts and only user's posts"""
         self.showing_user_posts_only = not self.showing_user_posts_only
         self.load_posts()
 
+    def search_posts(self, instance):
+        """Show posts matching the search box, or the whole feed when empty"""
+        self.search_query = self.search_input.text.strip()
+        self.load_posts()
+
     def handle_upvote(self, submission_id):
         """Handle upvoting a post"""
         if not self.db_helper:
             self.show_status("Database not available")
             return None
+        if submission_id in self.archived_ids:
+            return None
 
         try:
-            # Update upvote in database
-            new_count = self.db_helper.upvote_submission(submission_id)
+            current_count = next(
+                (post[9] for post in self.posts if post[0] == submission_id), 0)
+
+            # Buffer the upvote; it is written with others in a later batch
+            new_count = self.db_helper.upvotes.add(
+                submission_id, current_count)
 
             # Also update in local data
             for i, post in enumerate(self.posts):
@@ -741,6 +839,11 @@ class SocialScreen(Screen):
             self.show_status(f"Error upvoting: {str(e)}")
             return None
 
+    def on_leave(self):
+        """Write buffered upvotes out when the user leaves the feed"""
+        if self.db_helper:
+            self.db_helper.upvotes.flush_soon()
+
     def refresh_posts(self, instance):
         """Refresh posts from database"""
         self.load_posts()
@@ -0,0 +1,248 @@
+"""Fill a database with synthetic users, profiles, tasks and submissions
+
+Usage:
+    python seed_data.py --users 10000 --submissions 200000
+    python seed_data.py --db /tmp/bench.db --users 50000 --submissions 1000000 --seed 7
+
+The same seed and --end-date produce the same data on an empty database,
+so benchmarks of the feed, map and leaderboard can be compared between
+runs. --end-date defaults to today, which keeps the weekly and monthly
+leaderboards populated but changes the dates from one day to the next;
+pin it when runs on different days must match:
+    python seed_data.py --seed 7 --end-date 2025-01-01
+"""
+import argparse
+import random
+import struct
+import time
+import zlib
+from datetime import date, timedelta
+
+from db_helper import DatabaseHelper
+import password_hashing
+
+
+CITIES = [
+    ("Mumbai", "India", 19.0760, 72.8777),
+    ("Pune", "India", 18.5204, 73.8567),
+    ("Delhi", "India", 28.7041, 77.1025),
+    ("Bengaluru", "India", 12.9716, 77.5946),
+    ("London", "United Kingdom", 51.5074, -0.1278),
+    ("New York", "United States", 40.7128, -74.0060),
+    ("Nairobi", "Kenya", -1.2921, 36.8219),
+    ("Sao Paulo", "Brazil", -23.5505, -46.6333),
+    ("Berlin", "Germany", 52.5200, 13.4050),
+    ("Sydney", "Australia", -33.8688, 151.2093),
+    ("Tokyo", "Japan", 35.6762, 139.6503),
+    ("Cape Town", "South Africa", -33.9249, 18.4241),
+]
+
+TASKS = [
+    "Plant a tree in your neighbourhood",
+    "Use public transport for a day",
+    "Collect and recycle plastic waste",
+    "Switch off unused lights and appliances",
+    "Carry a reusable bag for your shopping",
+    "Start composting your kitchen waste",
+    "Organize a cleanup drive in a local park",
+    "Measure your carbon footprint",
+]
+
+DESCRIPTIONS = [
+    "Small steps add up. Happy to have done my part today!",
+    "Got my friends to join in as well, we will make it a weekly thing.",
+    "Harder than I expected but totally worth it.",
+    "Sharing this to encourage everyone around me to try it.",
+    "Learned a lot about how much waste we produce every day.",
+]
+
+OCCUPATIONS = ["Student", "Engineer", "Teacher", "Designer", "Doctor",
+               "Farmer", "Researcher", "Artist"]
+
+
+def make_png(width, height, rgb):
+    """Build a minimal solid-colour PNG without any imaging library"""
+    def chunk(kind, data):
+        body = kind + data
+        return (struct.pack(">I", len(data)) + body
+                + struct.pack(">I", zlib.crc32(body) & 0xffffffff))
+
+    row = b"\x00" + bytes(rgb) * width  # Filter byte, then RGB pixels
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(row * height))
+            + chunk(b"IEND", b""))
+
+
+def batched(rows, size):
+    """Yield lists of at most size rows from an iterable"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert_batches(conn, sql, rows, batch_size, label):
+    """executemany the rows, one transaction per batch; returns the row count"""
+    total = 0
+    started = time.time()
+    for batch in batched(rows, batch_size):
+        with conn:
+            conn.executemany(sql, batch)
+        total += len(batch)
+        print(f"  {label}: {total} rows", end="\r")
+
+    elapsed = time.time() - started
+    rate = total / elapsed if elapsed else total
+    print(f"  {label}: {total} rows in {elapsed:.1f}s ({rate:.0f} rows/s)")
+    return total
+
+
+def seed(db_path, users, submissions, seed_value=42, batch_size=10000,
+         image_ratio=0.3, image_variants=64, days=365, end_date=None):
+    """Generate the data set; returns a dict of row counts per table"""
+    rng = random.Random(seed_value)
+    end_date = end_date or date.today()
+    # Users exist from the start of the range, not from whenever this ran
+    start_date = end_date - timedelta(days=days)
+    db = DatabaseHelper(db_path)
+    conn = db.conn
+
+    # Losing a half-written seed run on a crash is fine, so trade durability
+    # for speed while loading
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -65536")
+
+    first_id = (conn.execute("SELECT MAX(id) FROM users").fetchone()[0] or 0) + 1
+    user_ids = range(first_id, first_id + users)
+    # Salt derived from the seed: a random one would differ on every run
+    password_hash = password_hashing.hash_password(
+        "password", db.password_iterations, salt=rng.randbytes(password_hashing.SALT_BYTES))
+    homes = {user_id: rng.choice(CITIES) for user_id in user_ids}
+
+    counts = {}
+    try:
+        print(f"Seeding {db_path} with seed {seed_value}")
+        counts['users'] = insert_batches(conn, '''
+            INSERT INTO users (id, username, password_hash, email, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', ((user_id, f"user{user_id}", password_hash,
+               f"user{user_id}@example.com", f"{start_date} 00:00:00")
+              for user_id in user_ids),
+            batch_size, "users")
+
+        counts['user_profiles'] = insert_batches(conn, '''
+            INSERT INTO user_profiles (user_id, full_name, username, email,
+                                       contact, city, country, occupation)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', ((user_id, f"Seed User {user_id}", f"user{user_id}",
+               f"user{user_id}@example.com", f"{rng.randrange(10**9, 10**10)}",
+               homes[user_id][0], homes[user_id][1], rng.choice(OCCUPATIONS))
+              for user_id in user_ids),
+            batch_size, "user_profiles")
+
+        # Most users complete a few tasks, a handful complete a lot
+        completions = {}
+
+        def task_rows():
+            for user_id in user_ids:
+                completed = min(int(rng.paretovariate(1.2)) - 1, 500)
+                completions[user_id] = completed
+                yield (user_id, rng.choice(TASKS), completed * 20, completed)
+
+        counts['task_management'] = insert_batches(conn, '''
+            INSERT INTO task_management (user_id, current_task, points, num_tasks_completed)
+            VALUES (?, ?, ?, ?)
+        ''', task_rows(), batch_size, "task_management")
+
+        # A small pool of distinct images; the media store keeps each once
+        image_hashes = [
+            db.media.put(make_png(64, 64, (rng.randrange(256), rng.randrange(256),
+                                           rng.randrange(256))))
+            for _ in range(image_variants)] if image_variants else []
+
+        def submission_rows():
+            for _ in range(submissions):
+                user_id = rng.choice(user_ids)
+                city, country, lat, lon = homes[user_id]
+                day = end_date - timedelta(days=rng.randrange(days))
+                image_hash = (rng.choice(image_hashes)
+                              if image_hashes and rng.random() < image_ratio else None)
+                yield (user_id, rng.choice(TASKS), image_hash,
+                       round(lat + rng.gauss(0, 0.05), 6),
+                       round(lon + rng.gauss(0, 0.05), 6),
+                       f"{city}, {country}", rng.choice(DESCRIPTIONS),
+                       day.isoformat(), min(int(rng.paretovariate(1.5)) - 1, 1000))
+
+        counts['user_submissions'] = insert_batches(conn, '''
+            INSERT INTO user_submissions (user_id, task_text, image_hash, latitude,
+                                          longitude, location_text, description,
+                                          submission_date, upvotes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', submission_rows(), batch_size, "user_submissions")
+
+        # Spread each user's completions over the days they were earned on,
+        # for the weekly and monthly leaderboards
+        def daily_rows():
+            for user_id, completed in completions.items():
+                buckets = {}
+                for _ in range(completed):
+                    day = end_date - timedelta(days=rng.randrange(days))
+                    buckets[day] = buckets.get(day, 0) + 1
+                for day, tasks in sorted(buckets.items()):
+                    yield (user_id, day.isoformat(), tasks * 20, tasks)
+
+        counts['points_daily'] = insert_batches(conn, '''
+            INSERT INTO points_daily (user_id, day, points, tasks)
+            VALUES (?, ?, ?, ?)
+        ''', daily_rows(), batch_size, "points_daily")
+
+        print("  Rebuilding leaderboard")
+        db.rebuild_leaderboard()
+        conn.execute("ANALYZE")
+    finally:
+        conn.execute("PRAGMA synchronous = NORMAL")
+        db.close()
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fill a ClimateCrew database with synthetic data for benchmarking")
+    parser.add_argument("--db", default="user_auth.db",
+                        help="database file to fill (default: user_auth.db)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--submissions", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42,
+                        help="random seed; the same seed gives the same data")
+    parser.add_argument("--batch", type=int, default=10000,
+                        help="rows per transaction")
+    parser.add_argument("--image-ratio", type=float, default=0.3,
+                        help="share of submissions that carry an image")
+    parser.add_argument("--image-variants", type=int, default=64,
+                        help="number of distinct synthetic images")
+    parser.add_argument("--days", type=int, default=365,
+                        help="spread submission dates over this many days")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None,
+                        help="latest submission date, YYYY-MM-DD (default: today)")
+    args = parser.parse_args()
+
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+
+    started = time.time()
+    counts = seed(args.db, args.users, args.submissions, seed_value=args.seed,
+                  batch_size=args.batch, image_ratio=args.image_ratio,
+                  image_variants=args.image_variants, days=args.days,
+                  end_date=args.end_date)
+    print(f"Seeded {sum(counts.values())} rows in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
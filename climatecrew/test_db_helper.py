@@ -0,0 +1,581 @@
+import unittest
+import hashlib
+import os
+import shutil
+import tempfile
+import sqlite3
+import threading
+from datetime import date, timedelta
+from db_helper import DatabaseHelper
+from archiver import SubmissionArchiver
+from async_db import AsyncDatabaseHelper
+from maintenance import DatabaseMaintenance
+from migrations import MIGRATIONS, apply_migrations, current_version
+
+
+class TestDatabaseHelper(unittest.TestCase):
+    def setUp(self):
+        # Work on a throwaway database instead of user_auth.db
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "test.db")
+        self.db = DatabaseHelper(self.db_path)
+        # Full-cost PBKDF2 would make every register/login take ~0.2s
+        self.db.password_iterations = 1000
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_connection_per_thread_in_wal_mode(self):
+        main_conn = self.db.conn
+        mode = main_conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+        seen = {}
+
+        def worker():
+            seen['conn'] = self.db.conn
+            self.db.register_user("worker", "secret", "worker@example.com")
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(seen['conn'], main_conn)
+        self.assertIs(self.db.conn, main_conn)
+        self.assertIsNotNone(
+            self.db.authenticate_user("worker", "secret"))
+
+    def test_connect_does_not_close_other_threads(self):
+        seen = {}
+        ready = threading.Event()
+        done = threading.Event()
+
+        def worker():
+            seen['conn'] = self.db.conn
+            ready.set()
+            done.wait()
+            seen['rows'] = seen['conn'].execute(
+                "SELECT COUNT(*) FROM users").fetchone()[0]
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        ready.wait()
+        self.db.connect()
+        done.set()
+        thread.join()
+
+        self.assertEqual(seen['rows'], 0)
+
+    def test_submission_pages_follow_keyset_cursor(self):
+        for day in range(1, 8):
+            for user_id in (1, 2):
+                self.db.add_submission(
+                    user_id, "task", description="post",
+                    submission_date=f"2024-01-{day:02d}")
+
+        seen = []
+        cursor = None
+        while True:
+            rows, cursor = self.db.get_submissions_page(cursor=cursor, limit=4)
+            seen.extend((row[8], row[0]) for row in rows)
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 14)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+        rows, cursor = self.db.get_submissions_page(user_id=2, limit=10)
+        self.assertEqual(len(rows), 7)
+        self.assertTrue(all(row[1] == 2 for row in rows))
+        self.assertIsNone(cursor)
+
+    def test_metadata_rows_exclude_image(self):
+        self.db.add_submission(1, "with image", image=b"png-bytes",
+                               submission_date="2024-01-02")
+        self.db.add_submission(1, "no image", submission_date="2024-01-01")
+
+        rows, _ = self.db.get_submissions_metadata(limit=10)
+        self.assertEqual([row[3] for row in rows], [1, 0])
+        self.assertEqual(
+            self.db.get_submission_image(rows[0][0]), b"png-bytes")
+        self.assertIsNone(self.db.get_submission_image(rows[1][0]))
+
+    def test_images_are_deduplicated_in_media_store(self):
+        self.db.add_submission(1, "first", image=b"same-bytes",
+                               submission_date="2024-01-01")
+        self.db.add_submission(2, "second", image=b"same-bytes",
+                               submission_date="2024-01-02")
+
+        rows = self.db.conn.execute(
+            "SELECT image, image_hash FROM user_submissions").fetchall()
+        self.assertTrue(all(image is None for image, _ in rows))
+        self.assertEqual(len({digest for _, digest in rows}), 1)
+        self.assertEqual(self.db.get_submission_image(1), b"same-bytes")
+
+    def test_legacy_blobs_migrate_to_media_store(self):
+        self.db.conn.execute(
+            "INSERT INTO user_submissions (user_id, task_text, image, submission_date) "
+            "VALUES (1, 'old', ?, '2023-05-01')", (b"legacy",))
+        self.db.conn.commit()
+
+        self.assertEqual(self.db.migrate_image_blobs(), 1)
+        path = self.db.get_submission_image_path(1)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b"legacy")
+        rows, _ = self.db.get_submissions_page()
+        self.assertEqual(rows[0][3], b"legacy")
+
+    def test_leaderboard_tracks_completed_tasks(self):
+        for index in range(4):
+            self.db.register_user(f"user{index}", "pw", f"{index}@example.com")
+            self.db.initialize_user_task(index + 1)
+
+        self.db.complete_task(3, 30)
+        self.db.complete_task(2, 10)
+        self.db.complete_task(3, 10)
+
+        top = self.db.get_leaderboard(limit=2)
+        self.assertEqual([row[3] for row in top], [3, 2])
+        self.assertEqual(top[0][:3], ("user2", 40, 2))
+        self.assertEqual(self.db.get_user_rank(1), (3, 0, 0))
+        self.assertEqual(self.db.get_user_rank(4), (4, 0, 0))
+        self.assertIsNone(self.db.get_user_rank(99))
+
+    def test_complete_tasks_bulk_awards_in_one_transaction(self):
+        for index in range(3):
+            self.db.register_user(f"user{index}", "pw", f"{index}@example.com")
+            self.db.initialize_user_task(index + 1)
+
+        awarded = self.db.complete_tasks_bulk([1, (2, 50), 1, 99])
+
+        self.assertEqual(awarded, {1: (40, 2), 2: (50, 1)})
+        self.assertEqual(self.db.get_user_stats(1), (40, 2))
+        self.assertEqual(self.db.get_user_rank(2), (1, 50, 1))
+
+    def test_concurrent_completions_do_not_lose_points(self):
+        self.db.register_user("busy", "pw", "busy@example.com")
+        self.db.initialize_user_task(1)
+
+        threads = [threading.Thread(
+            target=lambda: [self.db.complete_task(1, 5) for _ in range(10)])
+            for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.db.get_user_stats(1), (200, 40))
+
+    def test_upvotes_are_buffered_and_flushed_in_batch(self):
+        self.db.add_submission(1, "post", submission_date="2024-01-01")
+
+        self.assertEqual(self.db.upvotes.add(1, 0), 1)
+        self.assertEqual(self.db.upvotes.add(1, 1), 2)
+
+        stored = self.db.conn.execute(
+            "SELECT upvotes FROM user_submissions WHERE id = 1").fetchone()[0]
+        self.assertEqual(stored, 0)
+        rows, _ = self.db.get_submissions_metadata()
+        self.assertEqual(rows[0][9], 2)
+
+        self.assertEqual(self.db.upvotes.flush(), 2)
+        stored = self.db.conn.execute(
+            "SELECT upvotes FROM user_submissions WHERE id = 1").fetchone()[0]
+        self.assertEqual(stored, 2)
+        rows, _ = self.db.get_submissions_metadata()
+        self.assertEqual(rows[0][9], 2)
+
+    def test_migrations_apply_once_and_create_indexes(self):
+        self.assertEqual(current_version(self.db.conn), MIGRATIONS[-1][0])
+        self.assertEqual(apply_migrations(self.db.conn), [])
+
+        indexes = {row[0] for row in self.db.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for name in ("idx_submissions_feed", "idx_submissions_user_feed",
+                     "idx_task_management_points"):
+            self.assertIn(name, indexes)
+        self.assertNotIn("idx_users_username_login", indexes)
+
+        # Login probes the UNIQUE index on username
+        plan = " ".join(row[3] for row in self.db.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id, username, email, password_hash "
+            "FROM users WHERE username = ?", ("someone",)))
+        self.assertIn("sqlite_autoindex_users_1", plan)
+
+    def test_undated_submissions_stay_reachable_past_page_one(self):
+        self.db.add_submission(1, "today")
+        self.assertEqual(self.db.get_submissions_metadata()[0][0][8],
+                         date.today().isoformat())
+
+        # Rows saved before add_submission filled in a date stay NULL
+        path = os.path.join(self.tmp_dir, "old.db")
+        conn = sqlite3.connect(path)
+        apply_migrations(conn)
+        conn.executemany(
+            "INSERT INTO user_submissions (user_id, task_text, submission_date) "
+            "VALUES (1, ?, ?)",
+            [("undated", None), ("old", "2024-01-01"), ("new", "2024-02-01")])
+        conn.commit()
+        conn.close()
+
+        db = DatabaseHelper(path)
+        try:
+            seen, cursor = [], None
+            while True:
+                rows, cursor = db.get_submissions_metadata(cursor=cursor, limit=1)
+                seen.extend(row[2] for row in rows)
+                if cursor is None:
+                    break
+            self.assertEqual(seen, ["new", "old", "undated"])
+            self.assertIsNone(rows[-1][8])
+        finally:
+            db.close()
+
+    def test_profile_cache_hits_and_invalidates_on_write(self):
+        self.db.register_user("cached", "pw", "cached@example.com")
+
+        self.db.get_user_profile(1)
+        self.db.get_user_profile(1)
+        stats = self.db.profile_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+        self.db.save_onboarding_profile(1, "Cached User", "123", "Pune",
+                                        "India", "Engineer")
+        self.assertEqual(self.db.get_user_profile(1)[1], "Cached User")
+        self.db.update_user_profile(1, None, "Mumbai", None, None)
+        self.assertEqual(self.db.get_user_profile(1)[5], "Mumbai")
+
+    def test_profile_cache_evicts_by_size(self):
+        self.db.profile_cache.max_bytes = 1000
+        for index in range(5):
+            self.db.register_user(f"user{index}", "pw", f"{index}@example.com")
+            self.db.get_user_profile(index + 1)
+            self.db.update_user_profile(index + 1, None, None, None, None,
+                                        profile_image=bytes([index]) * 400)
+            self.db.get_user_profile(index + 1)
+
+        stats = self.db.profile_cache_stats()
+        self.assertLessEqual(stats['bytes'], 1000)
+        self.assertEqual(stats['entries'], 1)
+
+    def test_user_summaries_resolve_a_page_of_authors(self):
+        self.db.register_user("alice", "pw", "alice@example.com")
+        self.db.register_user("bob", "pw", "bob@example.com")
+        self.db.get_user_profile(2)
+        self.db.update_user_profile(2, None, None, None, None,
+                                    profile_image=b"avatar")
+
+        summaries = self.db.get_user_summaries([1, 2, 2, 99])
+
+        self.assertEqual(set(summaries), {1, 2})
+        self.assertEqual(summaries[1], ("alice", None))
+        username, path = summaries[2]
+        self.assertEqual(username, "bob")
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b"avatar")
+        self.assertEqual(self.db.get_user_summaries([]), {})
+
+    def test_bbox_query_uses_spatial_index(self):
+        self.db.add_submission(1, "mumbai", latitude=19.07, longitude=72.87,
+                               submission_date="2024-01-01")
+        self.db.add_submission(1, "pune", latitude=18.52, longitude=73.85,
+                               submission_date="2024-01-02")
+        self.db.add_submission(1, "fiji", latitude=-17.7, longitude=179.5,
+                               submission_date="2024-01-03")
+        self.db.add_submission(1, "nowhere", submission_date="2024-01-04")
+
+        rows = self.db.get_submissions_in_bbox(18, 72, 20, 74)
+        self.assertEqual([row[2] for row in rows], ["pune", "mumbai"])
+        self.assertEqual(
+            [row[2] for row in self.db.get_submissions_in_bbox(18, 72, 20, 74, limit=1)],
+            ["pune"])
+
+        # Boxes crossing the antimeridian wrap around
+        rows = self.db.get_submissions_in_bbox(-20, 170, -10, -170)
+        self.assertEqual([row[2] for row in rows], ["fiji"])
+
+        self.db.conn.execute(
+            "UPDATE user_submissions SET latitude = 40.7, longitude = -74.0 WHERE id = 2")
+        self.db.conn.execute("DELETE FROM user_submissions WHERE id = 1")
+        self.db.conn.commit()
+        self.assertEqual(self.db.get_submissions_in_bbox(18, 72, 20, 74), [])
+        self.assertEqual(
+            [row[0] for row in self.db.get_submissions_in_bbox(40, -75, 41, -73)], [2])
+
+    def test_search_submissions_ranks_and_pages(self):
+        self.db.add_submission(1, "Beach cleanup", location_text="Juhu, Mumbai",
+                               description="Collected plastic", submission_date="2024-01-01")
+        self.db.add_submission(2, "Plant a tree", location_text="Pune",
+                               description="Near the beach road", submission_date="2024-01-02")
+        self.db.add_submission(2, "Cycle to work", location_text="Mumbai",
+                               submission_date="2024-01-03")
+
+        rows, next_offset = self.db.search_submissions("beach")
+        self.assertEqual([row[0] for row in rows], [1, 2])
+        self.assertIsNone(next_offset)
+
+        rows, next_offset = self.db.search_submissions("mumbai", limit=1)
+        self.assertEqual(len(rows), 1)
+        more, _ = self.db.search_submissions("mumbai", offset=next_offset, limit=1)
+        self.assertEqual({rows[0][0], more[0][0]}, {1, 3})
+
+        self.assertEqual([row[0] for row in self.db.search_submissions(
+            "mumbai", user_id=2)[0]], [3])
+        self.assertEqual([row[0] for row in self.db.search_submissions("cle")[0]], [1])
+        self.assertEqual(self.db.search_submissions('" OR *')[0], [])
+
+        self.db.conn.execute(
+            "UPDATE user_submissions SET task_text = 'Lake cleanup' WHERE id = 1")
+        self.db.conn.execute("DELETE FROM user_submissions WHERE id = 2")
+        self.db.conn.commit()
+        self.assertEqual(self.db.search_submissions("beach")[0], [])
+        self.assertEqual([row[0] for row in self.db.search_submissions("lake")[0]], [1])
+
+    def test_user_aggregates_follow_posts_and_upvotes(self):
+        self.db.add_submission(1, "first", submission_date="2024-01-05")
+        self.db.add_submission(1, "second", submission_date="2024-01-02")
+        self.db.add_submission(2, "other", submission_date="2024-01-03")
+
+        self.db.upvotes.add(1)
+        self.db.upvotes.add(2)
+        self.db.upvotes.add(2)
+        self.db.upvotes.add(3)
+        self.db.upvotes.flush()
+
+        self.assertEqual(self.db.get_user_aggregates(1), (2, 3, "2024-01-05"))
+        self.assertEqual(self.db.get_user_aggregates_many([1, 2, 3]),
+                         {1: (2, 3, "2024-01-05"), 2: (1, 1, "2024-01-03")})
+        self.assertEqual(self.db.get_user_aggregates(3), (0, 0, None))
+
+    def test_windowed_leaderboard_sums_daily_buckets(self):
+        for index in range(3):
+            self.db.register_user(f"user{index}", "pw", f"{index}@example.com")
+            self.db.initialize_user_task(index + 1)
+
+        self.db.complete_task(1, 10)
+        self.db.complete_task(1, 10)
+        self.db.complete_task(2, 15)
+        # Older completions, as if recorded on earlier days
+        old = (date.today() - timedelta(days=20)).isoformat()
+        older = (date.today() - timedelta(days=60)).isoformat()
+        self.db.conn.executemany(
+            "INSERT INTO points_daily (user_id, day, points, tasks) VALUES (?, ?, ?, ?)",
+            [(2, old, 30, 1), (3, older, 500, 5)])
+        self.db.conn.commit()
+
+        weekly = self.db.get_leaderboard(days=7)
+        self.assertEqual(weekly, [("user0", 20, 2, 1), ("user1", 15, 1, 2)])
+        monthly = self.db.get_leaderboard(days=30)
+        self.assertEqual([row[3] for row in monthly], [2, 1])
+        self.assertEqual(monthly[0][1:3], (45, 2))
+
+        self.assertEqual(self.db.get_user_rank(2, days=7), (2, 15, 1))
+        self.assertEqual(self.db.get_user_rank(2, days=30), (1, 45, 2))
+        self.assertIsNone(self.db.get_user_rank(3, days=30))
+
+    def test_passwords_are_salted_and_legacy_hashes_upgrade(self):
+        self.assertEqual(self.db.register_user("new", "secret", "new@example.com"), 1)
+        self.assertFalse(self.db.register_user("new", "other", "x@example.com"))
+        stored = self.db.conn.execute(
+            "SELECT password_hash FROM users WHERE id = 1").fetchone()[0]
+        self.assertTrue(stored.startswith("pbkdf2_sha256$1000$"))
+        self.assertNotEqual(stored, self.db.hash_password("secret"))
+
+        # A user created by an older version, with an unsalted SHA-256 hash
+        legacy = hashlib.sha256(b"hunter2").hexdigest()
+        self.db.conn.execute(
+            "INSERT INTO users (username, password_hash, email) VALUES ('old', ?, 'old@example.com')",
+            (legacy,))
+        self.db.conn.commit()
+
+        self.assertIsNone(self.db.authenticate_user("old", "wrong"))
+        self.assertEqual(self.db.authenticate_user("old", "hunter2")[1], "old")
+        upgraded = self.db.conn.execute(
+            "SELECT password_hash FROM users WHERE username = 'old'").fetchone()[0]
+        self.assertTrue(upgraded.startswith("pbkdf2_sha256$"))
+        self.assertEqual(self.db.authenticate_user("old", "hunter2")[0], 2)
+        self.assertIsNone(self.db.authenticate_user("nobody", "hunter2"))
+
+    def test_writer_groups_commits_and_isolates_failures(self):
+        self.db.writer.max_latency = 0.05
+        futures = [self.db.write(lambda cursor, n=n: cursor.execute(
+            "INSERT INTO users (username, password_hash) VALUES (?, 'x')",
+            (f"user{n}",)).lastrowid) for n in range(20)]
+        # Duplicate username: fails alone, the rest of its batch still commits
+        failing = self.db.write(lambda cursor: cursor.execute(
+            "INSERT INTO users (username, password_hash) VALUES ('user0', 'x')"))
+
+        self.assertEqual(sorted(f.result() for f in futures), list(range(1, 21)))
+        with self.assertRaises(sqlite3.IntegrityError):
+            failing.result()
+        self.assertLess(self.db.writer.stats()['batches'], 21)
+        self.assertEqual(
+            self.db.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 20)
+
+        # Writes issued from inside a write run in place instead of deadlocking
+        nested = self.db.write(lambda cursor: self.db.write(
+            lambda inner: inner.execute(
+                "UPDATE users SET email = 'n@example.com' WHERE id = 1").rowcount).result())
+        self.assertEqual(nested.result(), 1)
+
+    def test_archived_submissions_stay_readable(self):
+        for day in range(1, 6):
+            self.db.add_submission(1, f"2022 post {day}", image=b"old-image",
+                                   submission_date=f"2022-03-0{day}")
+            self.db.add_submission(1, f"2023 post {day}",
+                                   submission_date=f"2023-03-0{day}")
+            self.db.add_submission(2, f"recent post {day}",
+                                   submission_date=f"2024-06-0{day}")
+        before, cursor = [], None
+        while True:
+            rows, cursor = self.db.get_submissions_metadata(cursor=cursor, limit=4)
+            before.extend(rows)
+            if cursor is None:
+                break
+
+        moved = SubmissionArchiver(self.db, max_age_days=365).archive(
+            today=date(2024, 7, 1))
+
+        self.assertEqual(moved, {"2022": 5, "2023": 5})
+        self.assertEqual(self.db.conn.execute(
+            "SELECT COUNT(*) FROM user_submissions").fetchone()[0], 5)
+
+        after, cursor = [], None
+        while True:
+            rows, cursor = self.db.get_submissions_metadata(cursor=cursor, limit=4)
+            after.extend(rows)
+            if cursor is None:
+                break
+        self.assertEqual(after, before)
+
+        rows, _ = self.db.get_submissions_page(user_id=1, limit=20)
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[-1][3], b"old-image")
+        self.assertEqual(self.db.get_submission_image(rows[-1][0]), b"old-image")
+
+    def test_backdated_live_posts_merge_with_archives(self):
+        for n in range(3):
+            self.db.add_submission(1, f"archived{n}", submission_date=f"2023-03-0{n + 1}")
+        SubmissionArchiver(self.db, max_age_days=365).archive(today=date(2024, 7, 1))
+        for n in range(3):
+            self.db.add_submission(1, f"new{n}", submission_date=f"2024-06-0{n + 1}")
+            self.db.add_submission(1, f"backdated{n}", submission_date=f"2020-01-0{n + 1}")
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = self.db.get_submissions_metadata(cursor=cursor, limit=4)
+            seen.extend(row[2] for row in rows)
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, ["new2", "new1", "new0",
+                                "archived2", "archived1", "archived0",
+                                "backdated2", "backdated1", "backdated0"])
+
+    def test_upvotes_on_archived_posts_are_not_counted(self):
+        self.db.add_submission(1, "old", submission_date="2023-03-01")
+        self.db.add_submission(1, "live", submission_date="2024-06-01")
+        SubmissionArchiver(self.db, max_age_days=365).archive(today=date(2024, 7, 1))
+        self.assertEqual(self.db.get_archived_ids([1, 2]), {1})
+
+        self.db.upvotes.add(1)
+        self.db.upvotes.add(2)
+
+        self.assertEqual(self.db.upvotes.flush(), 1)
+        self.assertFalse(self.db.upvotes.has_pending())
+        self.assertEqual(self.db.get_user_aggregates(1)[1], 1)
+
+    def test_maintenance_reclaims_space_and_refreshes_stats(self):
+        self.assertEqual(
+            self.db.conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        for n in range(300):
+            self.db.add_submission(1, f"task {n}", description="x" * 2000)
+        self.db.write(lambda cursor: cursor.execute(
+            "DELETE FROM user_submissions")).result()
+        self.assertTrue(self.db.is_idle(0))
+
+        report = DatabaseMaintenance(self.db_path, time_budget=5.0).run()
+
+        self.assertFalse(report['vacuumed'])
+        self.assertIn('user_submissions', report['analyzed'])
+        self.assertGreater(report['stats_changed'], 0)
+        self.assertGreater(report['pages_freed'], 0)
+        self.assertGreater(report['bytes_reclaimed'], 0)
+        self.assertEqual(
+            self.db.conn.execute("PRAGMA freelist_count").fetchone()[0], 0)
+
+    def test_maintenance_converts_existing_database_once(self):
+        path = os.path.join(self.tmp_dir, "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE notes (body TEXT)")
+        conn.commit()
+        conn.close()
+        # Background schedulers never run the unbudgeted VACUUM
+        self.assertFalse(DatabaseMaintenance(path, allow_vacuum=False).run()['vacuumed'])
+        conn = sqlite3.connect(path)
+        self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 0)
+        conn.close()
+
+        maintenance = DatabaseMaintenance(path)
+        self.assertTrue(maintenance.run()['vacuumed'])
+        self.assertFalse(maintenance.run()['vacuumed'])
+        self.assertIsNone(DatabaseMaintenance(
+            path, is_idle=lambda seconds: False).run_if_idle())
+
+
+class TestAsyncDatabaseHelper(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DatabaseHelper(os.path.join(self.tmp_dir, "test.db"))
+        # Stands in for Clock.schedule_once: queue the call and run it
+        # when the test says so, as the Kivy main loop would
+        self.scheduled = []
+        self.async_db = AsyncDatabaseHelper(
+            self.db, schedule=lambda fn: self.scheduled.append(fn))
+
+    def tearDown(self):
+        self.async_db.shutdown()
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def run_scheduled(self):
+        while self.scheduled:
+            self.scheduled.pop(0)(0)
+
+    def test_callbacks_run_on_the_scheduler(self):
+        results, errors = [], []
+        self.async_db.get_user_stats(1, callback=results.append)
+        self.async_db.submit(lambda: 1 / 0, on_error=errors.append)
+
+        self.async_db.shutdown()
+        # Nothing reaches the callers until the scheduler runs
+        self.assertEqual((results, errors), ([], []))
+        self.assertEqual(len(self.scheduled), 2)
+
+        self.run_scheduled()
+        self.assertEqual(results, [self.db.get_user_stats(1)])
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+    def test_shutdown_drains_pending_calls(self):
+        release = threading.Event()
+        done, delivered = [], []
+        # Workers are stuck until the timer fires, so all five calls are
+        # still queued when shutdown() starts waiting
+        self.async_db.submit(release.wait, 5)
+        self.async_db.submit(release.wait, 5)
+        futures = [self.async_db.submit(done.append, number,
+                                        callback=delivered.append)
+                   for number in range(5)]
+        threading.Timer(0.1, release.set).start()
+
+        self.async_db.shutdown()
+
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(sorted(done), list(range(5)))
+        self.run_scheduled()
+        self.assertEqual(delivered, [None] * 5)
+
+if __name__ == '__main__':
+    unittest.main()
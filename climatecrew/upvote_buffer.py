@@ -0,0 +1,99 @@
+import threading
+
+
+class UpvoteBuffer:
+    """Collects upvotes in memory and writes them to the database in batches
+
+    Each tap only bumps an in-memory counter and returns the optimistic count.
+    A background thread flushes the accumulated deltas in one transaction every
+    flush_interval seconds, and flush()/close() write them out on demand.
+    """
+
+    def __init__(self, db_helper, flush_interval=5.0):
+        self.db_helper = db_helper
+        self.flush_interval = flush_interval
+        self._pending = {}  # submission_id -> upvotes not yet flushed
+        self._in_flight = {}  # deltas currently being written
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def add(self, submission_id, current_count=0):
+        """Record one upvote and return the optimistic count to display"""
+        with self._lock:
+            self._pending[submission_id] = self._pending.get(
+                submission_id, 0) + 1
+        self._ensure_thread()
+        return (current_count or 0) + 1
+
+    def pending_for(self, submission_id):
+        """Upvotes for a submission that are not yet visible in the database"""
+        with self._lock:
+            return (self._pending.get(submission_id, 0)
+                    + self._in_flight.get(submission_id, 0))
+
+    def has_pending(self):
+        with self._lock:
+            return bool(self._pending or self._in_flight)
+
+    def flush(self):
+        """Write all pending upvotes in one transaction; returns how many landed"""
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._pending = self._pending, {}
+                self._in_flight = deltas
+
+            if not deltas:
+                return 0
+
+            written = self.db_helper.apply_upvote_deltas(deltas)
+
+            with self._lock:
+                self._in_flight = {}
+                if written is None:
+                    # Keep the votes for the next flush instead of dropping them
+                    for submission_id, delta in deltas.items():
+                        self._pending[submission_id] = self._pending.get(
+                            submission_id, 0) + delta
+
+            if written is None:
+                return 0
+            dropped = sorted(set(deltas) - written)
+            if dropped:
+                # Archived or deleted since the vote; there is no row to update
+                print(f"Dropped upvotes for submissions no longer live: {dropped}")
+            return sum(deltas[submission_id] for submission_id in written)
+
+    def flush_soon(self):
+        """Ask the background thread to flush now without waiting for it"""
+        if self._thread is not None:
+            self._wake.set()
+        else:
+            self.flush()
+
+    def close(self):
+        """Stop the background thread and write out what is left"""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval)
+            self._thread = None
+        self.flush()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(
+                    target=self._run, name="upvote-flush", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing upvotes: {e}")